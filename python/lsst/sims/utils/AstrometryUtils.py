@@ -1,8 +1,8 @@
 import numpy
 import palpy
-from lsst.sims.utils import arcsecFromRadians, cartesianFromSpherical, sphericalFromCartesian
+import warnings
 from lsst.sims.utils import radiansFromArcsec
-from lsst.sims.utils import haversine
+from lsst.sims.utils import ModifiedJulianDate
 
 __all__ = ["_solarRaDec", "solarRaDec",
            "_distanceToSun", "distanceToSun",
@@ -10,6 +10,7 @@ __all__ = ["_solarRaDec", "solarRaDec",
            "_applyPrecession", "applyPrecession",
            "_applyProperMotion", "applyProperMotion",
            "_appGeoFromICRS", "appGeoFromICRS",
+           "_appGeoFromICRSBatch",
            "_icrsFromAppGeo", "icrsFromAppGeo",
            "_observedFromAppGeo", "observedFromAppGeo",
            "_appGeoFromObserved", "appGeoFromObserved",
@@ -17,6 +18,182 @@ __all__ = ["_solarRaDec", "solarRaDec",
            "_icrsFromObserved", "icrsFromObserved"]
 
 
+# used to convert parallaxes from radians to the arcseconds palpy expects
+# in a single multiplication
+_arcsecPerRadian = 3600.0*180.0/numpy.pi
+
+# number of points _distanceToSun processes at a time for large catalogs
+_distanceBlockSize = 16384
+
+
+def _memoize(maxsize):
+    """
+    Decorator that caches the output of a function whose positional
+    arguments are all hashable (e.g. floats).  The cache is emptied
+    once it holds maxsize entries.  Callers should convert numbers that
+    may arrive as 0-d numpy arrays (which are not hashable) with float().
+
+    Because the cached outputs are shared between callers, numpy arrays
+    are made read-only before they are stored, so that a caller cannot
+    modify them in place and corrupt every later call with the same
+    arguments.  Other outputs should be immutable (e.g. tuples of floats).
+
+    @param [in] maxsize is the maximum number of outputs to store
+    """
+
+    def decorator(func):
+        cache = {}
+
+        def wrapper(*args):
+            if args in cache:
+                return cache[args]
+
+            if len(cache) >= maxsize:
+                cache.clear()
+
+            value = func(*args)
+            if isinstance(value, numpy.ndarray):
+                value.flags.writeable = False
+            cache[args] = value
+            return value
+
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def _raDecArray(ra, dec, out=None):
+    """
+    Pack two equal-length numpy arrays into the (2,N) output format used
+    throughout this module.
+
+    The rows are copied into a single C-contiguous buffer, so that
+    output[0] and output[1] are unit-stride, without the intermediate
+    list handling of numpy.array([ra, dec]).
+
+    @param [in] ra is a numpy array (the first row of the output)
+
+    @param [in] dec is a numpy array (the second row of the output)
+
+    @param [in] out is an optional (2,N) numpy array supplied by the caller
+    to be filled in (default: None, in which case a new array is allocated)
+
+    @param [out] a C-contiguous (2,N) numpy array
+    """
+    if out is None:
+        out = numpy.empty((2, len(ra)))
+    elif out.shape != (2, len(ra)):
+        raise RuntimeError("You passed an output array of shape %s; "
+                           "it needs to be of shape (2, %d)" % (str(out.shape), len(ra)))
+
+    out[0] = ra
+    out[1] = dec
+    return out
+
+
+def _float64Array(arr, methodName):
+    """
+    Return arr as a C-contiguous float64 numpy array, which is the only
+    form palpy's vector routines accept.  Arrays that are already in that
+    form are returned without being copied.
+
+    Other dtypes (e.g. float32) are upcast with a warning, since the copy
+    is made again on every call; callers holding float32 catalogs should
+    convert them once themselves.
+
+    @param [in] arr is a numpy array
+
+    @param [in] methodName is the name of the calling method (for the warning)
+
+    @param [out] arr as a C-contiguous float64 numpy array
+    """
+    if arr.dtype != numpy.float64:
+        warnings.warn("%s was passed an array of dtype %s; " % (methodName, arr.dtype)
+                      + "it is being converted to float64 on every call")
+
+    return numpy.ascontiguousarray(arr, dtype=numpy.float64)
+
+
+def _radiansBuffer(ra, dec, out, methodName):
+    """
+    Convert RA and Dec from degrees into the rows of a (2,N) array of radians.
+
+    The degree versions of the transformations below use this array both as
+    the radian input and as the output of the radian version (which reads all
+    of its input before writing any output), so that the conversion needs no
+    arrays of its own.
+
+    @param [in] ra in degrees
+
+    @param [in] dec in degrees
+
+    @param [in] out is the (2,N) numpy array passed in by the caller of the
+    transformation, or None, in which case a new array is allocated
+
+    @param [in] methodName is the name of the calling method (for error messages)
+
+    @param [out] a (2,N) numpy array whose rows are RA and Dec in radians
+    """
+    if len(ra) != len(dec):
+        raise RuntimeError("You passed %d RAs but %d Decs to %s" %
+                           (len(ra), len(dec), methodName))
+
+    raDec = _raDecArray(ra, dec, out=out)
+    return numpy.radians(raDec, out=raDec)
+
+
+@_memoize(64)
+def _mappaCached(epoch, mjd):
+    """
+    Cached wrapper around palpy.mappa, which evaluates the full
+    precession-nutation model and so is the most expensive
+    star-independent setup call in this module.  The forward and
+    reverse transformations (_appGeoFromICRS and _icrsFromAppGeo)
+    are typically called at the same date, so they share this cache.
+
+    @param [in] epoch is the Julian epoch of the mean equinox
+
+    @param [in] mjd is the date (TDB) as an MJD
+
+    @param [out] the numpy array of parameters returned by palpy.mappa.
+    This array is shared between callers, so it is read-only.
+    """
+    return palpy.mappa(epoch, mjd)
+
+
+@_memoize(64)
+def _prenutCached(epoch, mjd):
+    """
+    Cached wrapper around palpy.prenut, which evaluates the IAU 2006/2000A
+    precession-nutation model.  Catalogs are typically precessed in many
+    batches at the same date, so the matrix is only computed once.
+
+    @param [in] epoch is the Julian epoch of the mean equinox
+
+    @param [in] mjd is the date (TT) as an MJD
+
+    @param [out] the 3x3 precession-nutation matrix returned by palpy.prenut.
+    This array is shared between callers, so it is read-only.
+    """
+    return palpy.prenut(epoch, mjd)
+
+
+@_memoize(256)
+def _solarRaDecCached(mjd, epoch):
+    """
+    Cached implementation of _solarRaDec.  palpy.mappa is expensive,
+    so repeated calls at the same (mjd, epoch) should not rerun it.
+    """
+    params = _mappaCached(epoch, mjd)
+    # params[4:7] is a unit vector pointing from the Sun
+    # to the Earth (see the docstring for palpy.mappa)
+
+    return palpy.dcc2s(-1.0*params[4:7])
+
+
 def _solarRaDec(mjd, epoch=2000.0):
     """
     Return the RA and Dec of the Sun in radians
@@ -31,11 +208,9 @@ def _solarRaDec(mjd, epoch=2000.0):
     @param [out] Dec of Sun in radians
     """
 
-    params = palpy.mappa(epoch, mjd)
-    # params[4:7] is a unit vector pointing from the Sun
-    # to the Earth (see the docstring for palpy.mappa)
-
-    return palpy.dcc2s(-1.0*params[4:7])
+    # the cache is keyed on floats, since e.g. 0-d numpy arrays
+    # are not hashable
+    return _solarRaDecCached(float(mjd), float(epoch))
 
 
 def solarRaDec(mjd, epoch=2000.0):
@@ -72,14 +247,57 @@ def _distanceToSun(ra, dec, mjd, epoch=2000.0):
     @param [out] distance on the sky to the Sun in radians
     """
 
-    sunRa, sunDec = _solarRaDec(mjd, epoch=epoch)
+    sunRa, sunDec = _solarRaDecCached(float(mjd), float(epoch))
+
+    # _greatCircleDistance is built from numpy ufuncs, so the scalar
+    # solar position broadcasts against arrays of (ra, dec) without
+    # needing to be copied into arrays of its own
+    if not isinstance(ra, numpy.ndarray) or not isinstance(dec, numpy.ndarray) \
+       or ra.ndim != 1 or ra.shape != dec.shape or len(ra) <= _distanceBlockSize:
+
+        return _greatCircleDistance(ra, dec, sunRa, sunDec)
+
+    # For large catalogs, evaluate the formula one block at a time so that
+    # its intermediate arrays stay in cache instead of each making a full
+    # pass through memory
+    output = numpy.empty(len(ra))
+    for ix in range(0, len(ra), _distanceBlockSize):
+        block = slice(ix, ix+_distanceBlockSize)
+        output[block] = _greatCircleDistance(ra[block], dec[block], sunRa, sunDec)
+    return output
+
+
+def _greatCircleDistance(long1, lat1, long2, lat2):
+    """
+    Return the angular distance between two points in radians.
+
+    This uses the special case of the Vincenty formula for a sphere, which
+    (unlike the arcsin form of the haversine formula) stays accurate for
+    separations approaching 180 degrees, i.e. points near opposition to
+    the Sun.
+
+    @param [in] long1 is the longitude of point 1 in radians
+
+    @param [in] lat1 is the latitude of point 1 in radians
+
+    @param [in] long2 is the longitude of point 2 in radians
+
+    @param [in] lat2 is the latitude of point 2 in radians
 
-    if hasattr(ra, '__len__'):
-        return haversine(ra, dec,
-                         numpy.array([sunRa]*len(ra)),
-                         numpy.array([sunDec]*len(ra)))
+    @param [out] the angular separation between points 1 and 2 in radians
 
-    return haversine(ra, dec,sunRa, sunDec)
+    From https://en.wikipedia.org/wiki/Great-circle_distance
+    """
+    sinLat1 = numpy.sin(lat1)
+    cosLat1 = numpy.cos(lat1)
+    sinLat2 = numpy.sin(lat2)
+    cosLat2 = numpy.cos(lat2)
+    dLong = long2 - long1
+    cosDLong = numpy.cos(dLong)
+
+    x = cosLat2*numpy.sin(dLong)
+    y = cosLat1*sinLat2 - sinLat1*cosLat2*cosDLong
+    return numpy.arctan2(numpy.hypot(x, y), sinLat1*sinLat2 + cosLat1*cosLat2*cosDLong)
 
 
 def distanceToSun(ra, dec, mjd, epoch=2000.0):
@@ -98,8 +316,13 @@ def distanceToSun(ra, dec, mjd, epoch=2000.0):
     @param [out] distance on the sky to the Sun in degrees
     """
 
-    return numpy.degrees(_distanceToSun(numpy.radians(ra), numpy.radians(dec),
-                                        mjd, epoch=epoch))
+    output = _distanceToSun(numpy.radians(ra), numpy.radians(dec), mjd, epoch=epoch)
+
+    if isinstance(output, numpy.ndarray):
+        # convert in place rather than allocating another array
+        return numpy.degrees(output, out=output)
+
+    return numpy.degrees(output)
 
 
 def refractionCoefficients(wavelength=0.5, site=None):
@@ -164,7 +387,7 @@ def applyRefraction(zenithDistance, tanzCoeff, tan3zCoeff):
     return refractedZenith
 
 
-def applyPrecession(ra, dec, epoch=2000.0, mjd=None):
+def applyPrecession(ra, dec, epoch=2000.0, mjd=None, singlePrecision=False):
     """
     applyPrecession() applies precesion and nutation to coordinates between two epochs.
     Accepts RA and dec as inputs.  Returns corrected RA and dec (in degrees).
@@ -184,6 +407,9 @@ def applyPrecession(ra, dec, epoch=2000.0, mjd=None):
     @param [in] mjd is an instantiation of the ModifiedJulianDate class
     representing the date of the observation
 
+    @param [in] singlePrecision toggles whether or not to do the rotation
+    in 32-bit floating point (see _applyPrecession; default False)
+
     @param [out] a 2-D numpy array in which the first row is the RA
     corrected for precession and nutation and the second row is the
     Dec corrected for precession and nutation (both in degrees)
@@ -191,13 +417,15 @@ def applyPrecession(ra, dec, epoch=2000.0, mjd=None):
     """
 
     output = _applyPrecession(numpy.radians(ra), numpy.radians(dec),
-                              epoch=epoch, mjd=mjd)
+                              epoch=epoch, mjd=mjd,
+                              singlePrecision=singlePrecision)
 
-    return numpy.degrees(output)
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 
-def _applyPrecession(ra, dec, epoch=2000.0, mjd=None):
+def _applyPrecession(ra, dec, epoch=2000.0, mjd=None, singlePrecision=False):
     """
     _applyPrecession() applies precesion and nutation to coordinates between two epochs.
     Accepts RA and dec as inputs.  Returns corrected RA and dec (in radians).
@@ -208,24 +436,38 @@ def _applyPrecession(ra, dec, epoch=2000.0, mjd=None):
     The precession-nutation matrix is calculated by the palpy.prenut method
     which uses the IAU 2006/2000A model
 
-    @param [in] ra in radians
+    @param [in] ra in radians.  Can be a float, a list or a numpy array.
 
-    @param [in] dec in radians
+    @param [in] dec in radians.  Can be a float, a list or a numpy array.
 
     @param [in] epoch is the epoch of the mean equinox (in years; default 2000)
 
     @param [in] mjd is an instantiation of the ModifiedJulianDate class
     representing the date of the observation
 
+    @param [in] singlePrecision toggles whether or not to do the rotation
+    in 32-bit floating point (default False).  This is faster for large
+    arrays, but the results are only good to about 0.1 arcseconds,
+    rather than the ~1 milliarcsecond accuracy of the precession model.
+    The output is still returned as 64-bit floats.
+
     @param [out] a 2-D numpy array in which the first row is the RA
     corrected for precession and nutation and the second row is the
-    Dec corrected for precession and nutation (both in radians)
+    Dec corrected for precession and nutation (both in radians).
+    If ra and dec were floats, this will be a 1-D numpy array
+    containing the corrected RA and Dec.
     """
 
-    if hasattr(ra, '__len__'):
-        if len(ra) != len(dec):
-            raise RuntimeError("You supplied %d RAs but %d Decs to applyPrecession" %
-                               (len(ra), len(dec)))
+    # scalars are promoted to length-1 arrays so that there is a single
+    # (vectorized) code path; the output is squeezed back down at the end.
+    # (lists are treated like numpy arrays, not like scalars)
+    isScalar = numpy.ndim(ra) == 0
+    ra = numpy.atleast_1d(ra)
+    dec = numpy.atleast_1d(dec)
+
+    if len(ra) != len(dec):
+        raise RuntimeError("You supplied %d RAs but %d Decs to applyPrecession" %
+                           (len(ra), len(dec)))
 
     if mjd is None:
         raise RuntimeError("You need to supply applyPrecession with an mjd")
@@ -236,14 +478,40 @@ def _applyPrecession(ra, dec, epoch=2000.0, mjd=None):
     #
     #TODO it is not specified what this MJD should be (i.e. in which
     #time system it should be reckoned)
-    rmat=palpy.prenut(epoch, mjd.TT)
+    rmat=_prenutCached(float(epoch), float(mjd.TT))
 
     # Apply rotation matrix
-    xyz = cartesianFromSpherical(ra,dec)
-    xyz =  numpy.dot(rmat,xyz.transpose()).transpose()
-
-    raOut,decOut = sphericalFromCartesian(xyz)
-    return numpy.array([raOut,decOut])
+    #
+    # The Cartesian points are built directly as a (3, N) array so that
+    # the rotation is a single matrix product with no transposes.  The
+    # trigonometric functions write straight into the rows of that array
+    # to avoid allocating a temporary for each of them.
+    if singlePrecision:
+        ra = ra.astype(numpy.float32)
+        dec = dec.astype(numpy.float32)
+        rmat = rmat.astype(numpy.float32)
+
+    cosDec = numpy.cos(dec)
+    xyz = numpy.empty((3, len(ra)), dtype=cosDec.dtype)
+    numpy.cos(ra, out=xyz[0])
+    numpy.sin(ra, out=xyz[1])
+    numpy.sin(dec, out=xyz[2])
+    xyz[0] *= cosDec
+    xyz[1] *= cosDec
+    xyz = numpy.dot(rmat, xyz)
+
+    # Convert back to spherical coordinates writing straight into the
+    # rows of the output; once RA is known, the x row is overwritten
+    # with sqrt(x^2+y^2) for the Dec calculation
+    output = numpy.empty((2, len(ra)))
+    numpy.arctan2(xyz[1], xyz[0], out=output[0])
+    numpy.hypot(xyz[0], xyz[1], out=xyz[0])
+    numpy.arctan2(xyz[2], xyz[0], out=output[1])
+
+    if isScalar:
+        return output[:,0]
+
+    return output
 
 
 def applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
@@ -290,7 +558,8 @@ def applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
                                 radiansFromArcsec(parallax),
                                 v_rad, epoch=epoch, mjd=mjd)
 
-    return numpy.degrees(output)
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 def _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
@@ -332,10 +601,7 @@ def _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
 
     """
 
-    if isinstance(ra, list) or isinstance(dec, list) or \
-    isinstance(pm_ra, list) or isinstance(pm_dec, list) or \
-    isinstance(parallax, list) or isinstance(v_rad, list):
-
+    if any(isinstance(arg, list) for arg in (ra, dec, pm_ra, pm_dec, parallax, v_rad)):
         raise RuntimeError("You tried to pass lists to applyPm. " +
                            "The method does not know how to handle lists. " +
                            "Use numpy arrays.")
@@ -343,7 +609,23 @@ def _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
     if mjd is None:
         raise RuntimeError("cannot call applyProperMotion; mjd is None")
 
-    parallaxArcsec=arcsecFromRadians(parallax)
+    # scalars are promoted to length-1 arrays so that palpy.pmVector
+    # can handle both cases; the output is squeezed back down at the end
+    isScalar = not isinstance(ra, numpy.ndarray)
+    ra = numpy.atleast_1d(ra)
+    dec = numpy.atleast_1d(dec)
+    pm_ra = numpy.atleast_1d(pm_ra)
+    pm_dec = numpy.atleast_1d(pm_dec)
+    parallax = numpy.atleast_1d(parallax)
+    v_rad = numpy.atleast_1d(v_rad)
+
+    lengths = (len(ra), len(dec), len(pm_ra), len(pm_dec), len(parallax), len(v_rad))
+    if lengths.count(lengths[0]) != len(lengths):
+        raise RuntimeError(("You passed: %d RAs, %d Dec, %d pm_ras, %d pm_decs, " +
+                            "%d parallaxes, %d v_rads to applyPm; " +
+                            "those numbers need to be identical.") % lengths)
+
+    parallaxArcsec = parallax*_arcsecPerRadian
     #convert to Arcsec because that is what PALPY expects
 
     # Generate Julian epoch from MJD
@@ -357,29 +639,17 @@ def _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad, \
 
     #because PAL and ERFA expect proper motion in terms of "coordinate
     #angle; not true angle" (as stated in erfa/starpm.c documentation)
-    pm_ra_corrected = pm_ra/numpy.cos(dec)
-
-    if isinstance(ra, numpy.ndarray):
-        if len(ra) != len(dec) or \
-        len(ra) != len(pm_ra) or \
-        len(ra) != len(pm_dec) or \
-        len(ra) != len(parallaxArcsec) or \
-        len(ra) != len(v_rad):
-
-            raise RuntimeError("You passed: " +
-                               "%d RAs, " % len(ra) +
-                               "%d Dec, " % len(dec) +
-                               "%d pm_ras, " % len(pm_ra) +
-                               "%d pm_decs, " % len(pm_dec) +
-                               "%d parallaxes, " % len(parallaxArcsec)+
-                               "%d v_rads " % len(v_rad) +
-                               "to applyPm; those numbers need to be identical.")
-
-        raOut, decOut = palpy.pmVector(ra,dec,pm_ra_corrected,pm_dec,parallaxArcsec,v_rad, epoch, julianEpoch)
-    else:
-        raOut, decOut = palpy.pm(ra, dec, pm_ra_corrected, pm_dec, parallaxArcsec, v_rad, epoch, julianEpoch)
+    #
+    #The division is done in place in the buffer holding cos(dec)
+    pm_ra_corrected = numpy.cos(dec)
+    numpy.divide(pm_ra, pm_ra_corrected, out=pm_ra_corrected)
+
+    raOut, decOut = palpy.pmVector(ra,dec,pm_ra_corrected,pm_dec,parallaxArcsec,v_rad, epoch, julianEpoch)
 
-    return numpy.array([raOut,decOut])
+    if isScalar:
+        return numpy.array([raOut[0], decOut[0]])
+
+    return _raDecArray(raOut, decOut)
 
 
 
@@ -425,17 +695,17 @@ def appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
     else:
         pm_dec_in = None
 
-    if parallax is not None:
-        px_in = radiansFromArcsec(parallax)
-    else:
-        px_in = None
-
-    output = _appGeoFromICRS(numpy.radians(ra), numpy.radians(dec),
-                             pm_ra=pm_ra_in, pm_dec=pm_dec_in,
-                             parallax=px_in, v_rad=v_rad, epoch=epoch, mjd=mjd)
+    # palpy wants the parallax in arcsec, so pass it straight through
+    # rather than converting it to radians and back again
+    raOut, decOut = _appGeoFromICRSTuple(numpy.radians(ra), numpy.radians(dec),
+                                         pm_ra=pm_ra_in, pm_dec=pm_dec_in,
+                                         parallax=parallax, v_rad=v_rad, epoch=epoch, mjd=mjd,
+                                         parallaxInArcsec=True)
 
+    output = _raDecArray(raOut, decOut)
 
-    return numpy.degrees(output)
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 def _appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
@@ -470,6 +740,26 @@ def _appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
     geocentric RAand the second row is the apparent geocentric Dec (both in radians)
     """
 
+    raOut, decOut = _appGeoFromICRSTuple(ra, dec, pm_ra=pm_ra, pm_dec=pm_dec,
+                                         parallax=parallax, v_rad=v_rad,
+                                         epoch=epoch, mjd=mjd)
+
+    return _raDecArray(raOut, decOut)
+
+
+def _appGeoFromICRSTuple(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
+                         v_rad=None, epoch=2000.0, mjd=None, parallaxInArcsec=False):
+    """
+    Implementation of _appGeoFromICRS which returns the apparent geocentric
+    RA and Dec (in radians) as a tuple of two numpy arrays exactly as
+    palpy produces them.  This lets callers that immediately unpack the
+    result (e.g. _observedFromICRS) skip stacking them into a (2,N) array.
+
+    The arguments are the same as those of _appGeoFromICRS, except for
+    parallaxInArcsec which, if True, indicates that parallax is already in
+    arcsec (the units palpy expects) rather than radians.
+    """
+
     if mjd is None:
         raise RuntimeError("cannot call appGeoFromICRS; mjd is None")
 
@@ -477,17 +767,8 @@ def _appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
         raise RuntimeError('appGeoFromICRS: len(ra) %d len(dec) %d '
                         % (len(ra),len(dec)))
 
-    if pm_ra is None:
-        pm_ra=numpy.zeros(len(ra))
-
-    if pm_dec is None:
-        pm_dec=numpy.zeros(len(ra))
-
-    if v_rad is None:
-        v_rad=numpy.zeros(len(ra))
-
-    if parallax is None:
-        parallax=numpy.zeros(len(ra))
+    ra = _float64Array(ra, 'appGeoFromICRS')
+    dec = _float64Array(dec, 'appGeoFromICRS')
 
     # Define star independent mean to apparent place parameters
     # palpy.mappa calculates the star-independent parameters
@@ -499,7 +780,7 @@ def _appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
     # epoch of mean equinox to be used (Julian)
     #
     # date (MJD)
-    prms=palpy.mappa(epoch, mjd.TDB)
+    prms=_mappaCached(float(epoch), float(mjd.TDB))
 
     # palpy.mapqk does a quick mean to apparent place calculation using
     # the output of palpy.mappa
@@ -507,17 +788,167 @@ def _appGeoFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
     # Taken from the palpy source code (palMap.c which calls both palMappa and palMapqk):
     # The accuracy is sub-milliarcsecond, limited by the
     # precession-nutation model (see palPrenut for details).
+    #
+    # If there is no space motion at all, palpy.mapqkz does the same
+    # transformation without the proper motion and parallax steps
+    if _noSpaceMotion(pm_ra, pm_dec, parallax, v_rad):
+        if len(ra) == 1:
+            # palpy's scalar routines skip the array handling of the vector
+            # routines, which is most of the cost for a single object
+            raOut, decOut = palpy.mapqkz(ra[0], dec[0], prms)
+            return numpy.array([raOut]), numpy.array([decOut])
+
+        return palpy.mapqkzVector(ra, dec, prms)
+
+    pm_ra_corrected, pm_dec, parallaxArcsec, v_rad = \
+    _prepareMapqkInputs(dec, pm_ra, pm_dec, parallax, v_rad,
+                        parallaxInArcsec=parallaxInArcsec)
+
+    return palpy.mapqkVector(ra,dec,pm_ra_corrected,pm_dec,parallaxArcsec,v_rad,prms)
+
+
+def _noSpaceMotion(pm_ra, pm_dec, parallax, v_rad):
+    """
+    Return True if none of the space motion inputs of _appGeoFromICRS
+    were specified, in which case palpy.mapqkz can be used in place of
+    palpy.mapqk.
+    """
+    return pm_ra is None and pm_dec is None and parallax is None and v_rad is None
+
+
+def _prepareMapqkInputs(dec, pm_ra, pm_dec, parallax, v_rad, parallaxInArcsec=False):
+    """
+    Put the star-dependent inputs of _appGeoFromICRS into the form
+    expected by palpy.mapqkVector.  Quantities that are None are
+    replaced by arrays of zeros.
+
+    @param [in] dec in radians (ICRS).  Must be a numpy array.
+
+    @param [in] pm_ra is ra proper motion multiplied by cos(Dec) in radians/year
+
+    @param [in] pm_dec is dec proper motion in radians/year
+
+    @param [in] parallax in radians
+
+    @param [in] v_rad is radial velocity in km/sec (positive if the object is receding)
+
+    @param [in] parallaxInArcsec is a boolean indicating that parallax has
+    been passed in arcsec rather than radians (default False)
+
+    @param [out] pm_ra divided by cos(Dec) in radians/year
+
+    @param [out] pm_dec in radians/year
+
+    @param [out] parallax in arcsec
+
+    @param [out] v_rad in km/sec
+    """
+
+    if pm_ra is None:
+        pm_ra=numpy.zeros(len(dec))
+
+    if pm_dec is None:
+        pm_dec=numpy.zeros(len(dec))
+
+    if v_rad is None:
+        v_rad=numpy.zeros(len(dec))
+
+    if parallax is None:
+        parallaxArcsec=numpy.zeros(len(dec))
+    elif parallaxInArcsec:
+        # palpy.mapqkVector only accepts float64 arrays; the radian branch
+        # gets this conversion for free from the multiplication
+        parallaxArcsec = numpy.asarray(parallax, dtype=numpy.float64)
+    else:
+        parallaxArcsec = parallax*_arcsecPerRadian
 
     # because PAL and ERFA expect proper motion in terms of "coordinate
     # angle; not true angle" (as stated in erfa/starpm.c documentation)
-    pm_ra_corrected = pm_ra/numpy.cos(dec)
+    pm_ra_corrected = numpy.cos(dec)
+    numpy.divide(pm_ra, pm_ra_corrected, out=pm_ra_corrected)
+
+    return pm_ra_corrected, pm_dec, parallaxArcsec, v_rad
+
+
+def _appGeoFromICRSBatch(ra, dec, pm_ra=None, pm_dec=None, parallax=None,
+                         v_rad=None, epoch=2000.0, mjdList=None):
+    """
+    Convert the mean position (RA, Dec) in the International Celestial Reference
+    System (ICRS) to the mean apparent geocentric position at several dates.
+
+    This is equivalent to calling _appGeoFromICRS once per date, except that the
+    star-dependent inputs (the cos(Dec) correction to pm_ra, the conversion of
+    parallax to arcsec, etc.) are only prepared once.
+
+    units:  ra (radians), dec (radians), pm_ra (radians/year), pm_dec
+    (radians/year), parallax (radians), v_rad (km/sec; positive if receding),
+    epoch (Julian years)
+
+    @param [in] ra in radians (ICRS).  Must be a numpy array.
+
+    @param [in] dec in radians (ICRS).  Must be a numpy array.
+
+    @param [in] pm_ra is ra proper motion multiplied by cos(Dec) in radians/year
+
+    @param [in] pm_dec is dec proper motion in radians/year
+
+    @param [in] parallax in radians
+
+    @param [in] v_rad is radial velocity in km/sec (positive if the object is receding)
+
+    @param [in] epoch is the julian epoch (in years) of the equinox against which to
+    measure RA (default: 2000.0)
+
+    @param [in] mjdList is a list of instantiations of the ModifiedJulianDate class
+    representing the dates of the observations, or a single ModifiedJulianDate
+    holding an array of dates (see ModifiedJulianDate.fromArray)
+
+    @param [out] a 3-D numpy array.  output[i] is the 2-D array that _appGeoFromICRS
+    would return for mjdList[i], i.e. output[i][0] is the apparent geocentric RA and
+    output[i][1] is the apparent geocentric Dec (both in radians)
+    """
 
-    raOut,decOut = palpy.mapqkVector(ra,dec,pm_ra_corrected,pm_dec,arcsecFromRadians(parallax),v_rad,prms)
+    if mjdList is None:
+        raise RuntimeError("cannot call appGeoFromICRSBatch; mjdList is None")
 
-    return numpy.array([raOut,decOut])
+    if len(ra) != len(dec):
+        raise RuntimeError('appGeoFromICRSBatch: len(ra) %d len(dec) %d '
+                        % (len(ra),len(dec)))
+
+    ra = _float64Array(ra, 'appGeoFromICRSBatch')
+    dec = _float64Array(dec, 'appGeoFromICRSBatch')
+
+    noSpaceMotion = _noSpaceMotion(pm_ra, pm_dec, parallax, v_rad)
+    if not noSpaceMotion:
+        pm_ra_corrected, pm_dec, parallaxArcsec, v_rad = \
+        _prepareMapqkInputs(dec, pm_ra, pm_dec, parallax, v_rad)
+
+    if isinstance(mjdList, ModifiedJulianDate):
+        # the TDBs of all of the dates come from one call to astropy
+        tdbList = mjdList.TDB
+    else:
+        tdbList = [mjd.TDB for mjd in mjdList]
+
+    # the star-independent parameters are cached locally rather than in
+    # _mappaCached: a batch can contain more dates than that cache holds,
+    # and would otherwise evict the entries used by single-date callers
+    prmsCache = {}
+
+    output = numpy.empty((len(tdbList), 2, len(ra)))
+    for ix, tdb in enumerate(tdbList):
+        if tdb not in prmsCache:
+            prmsCache[tdb] = palpy.mappa(epoch, tdb)
+        prms = prmsCache[tdb]
+        if noSpaceMotion:
+            output[ix][0], output[ix][1] = palpy.mapqkzVector(ra, dec, prms)
+        else:
+            output[ix][0], output[ix][1] = palpy.mapqkVector(ra, dec, pm_ra_corrected, pm_dec,
+                                                             parallaxArcsec, v_rad, prms)
+
+    return output
 
 
-def _icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None):
+def _icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None, out=None):
     """
     Convert the apparent geocentric position in (RA, Dec) to
     the mean position in the International Celestial Reference
@@ -541,6 +972,9 @@ def _icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None):
     @param [in] mjd is an instantiation of the ModifiedJulianDate class
     representing the date of the observation
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the mean ICRS RA and
     the second row is the mean ICRS Dec (both in radians)
     """
@@ -555,14 +989,25 @@ def _icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None):
     # epoch of mean equinox to be used (Julian)
     #
     # date (MJD)
-    params = palpy.mappa(epoch, mjd.TDB)
+    params = _mappaCached(float(epoch), float(mjd.TDB))
+
+    if len(ra) != len(dec):
+        raise RuntimeError("You passed %d RAs but %d Decs to icrsFromAppGeo" %
+                           (len(ra), len(dec)))
 
-    raOut, decOut = palpy.ampqkVector(ra, dec, params)
+    if len(ra) == 1:
+        # palpy's scalar routines skip the array handling of the vector
+        # routines, which is most of the cost for a single object
+        raOut, decOut = palpy.ampqk(ra[0], dec[0], params)
+        return _raDecArray((raOut,), (decOut,), out=out)
 
-    return numpy.array([raOut, decOut])
+    raOut, decOut = palpy.ampqkVector(_float64Array(ra, 'icrsFromAppGeo'),
+                                      _float64Array(dec, 'icrsFromAppGeo'), params)
 
+    return _raDecArray(raOut, decOut, out=out)
 
-def icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None):
+
+def icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None, out=None):
     """
     Convert the apparent geocentric position in (RA, Dec) to
     the mean position in the International Celestial Reference
@@ -586,18 +1031,24 @@ def icrsFromAppGeo(ra, dec, epoch=2000.0, mjd = None):
     @param [in] mjd is an instantiation of the ModifiedJulianDate class
     representing the date of the observation
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the mean ICRS RA and
     the second row is the mean ICRS Dec (both in degrees)
     """
 
-    raOut, decOut = _icrsFromAppGeo(numpy.radians(ra), numpy.radians(dec),
-                                    epoch=epoch, mjd=mjd)
+    raDec = _radiansBuffer(ra, dec, out, 'icrsFromAppGeo')
 
-    return numpy.array([numpy.degrees(raOut), numpy.degrees(decOut)])
+    output = _icrsFromAppGeo(raDec[0], raDec[1],
+                             epoch=epoch, mjd=mjd, out=raDec)
+
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 def observedFromAppGeo(ra, dec, includeRefraction = True,
-                       altAzHr=False, wavelength=0.5, obs_metadata = None):
+                       altAzHr=False, wavelength=0.5, obs_metadata = None, out=None):
     """
     Convert apparent geocentric (RA, Dec) to observed (RA, Dec).  More
     specifically: apply refraction and diurnal aberration.
@@ -618,6 +1069,9 @@ def observedFromAppGeo(ra, dec, includeRefraction = True,
     @param [in] obs_metadata is an ObservationMetaData characterizing the
     observation.
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the observed RA
     and the second row is the observed Dec (both in degrees)
 
@@ -626,22 +1080,55 @@ def observedFromAppGeo(ra, dec, includeRefraction = True,
     if altAzHr == True.
     """
 
+    raDecIn = _radiansBuffer(ra, dec, out, 'observedFromAppGeo')
+
     if altAzHr:
         raDec, \
-        altAz = _observedFromAppGeo(numpy.radians(ra), numpy.radians(dec),
+        altAz = _observedFromAppGeo(raDecIn[0], raDecIn[1],
                                             includeRefraction=includeRefraction,
                                             altAzHr=altAzHr, wavelength=wavelength,
-                                            obs_metadata=obs_metadata)
+                                            obs_metadata=obs_metadata, out=raDecIn)
 
-        return numpy.degrees(raDec), numpy.degrees(altAz)
+        # convert in place rather than allocating more arrays
+        return numpy.degrees(raDec, out=raDec), numpy.degrees(altAz, out=altAz)
 
     else:
-        output = _observedFromAppGeo(numpy.radians(ra), numpy.radians(dec),
+        output = _observedFromAppGeo(raDecIn[0], raDecIn[1],
                                             includeRefraction=includeRefraction,
                                             altAzHr=altAzHr, wavelength=wavelength,
-                                            obs_metadata=obs_metadata)
+                                            obs_metadata=obs_metadata, out=raDecIn)
+
+        # convert in place rather than allocating another array
+        return numpy.degrees(output, out=output)
+
+
+def _validateObservedInputs(ra, dec, obs_metadata, methodName):
+    """
+    Raise a RuntimeError if the inputs to a transformation between
+    apparent geocentric and observed coordinates are unusable.
+
+    @param [in] ra is a numpy array of RAs
+
+    @param [in] dec is a numpy array of Decs
+
+    @param [in] obs_metadata is an ObservationMetaData characterizing the
+    observation
+
+    @param [in] methodName is the name of the transformation (for error messages)
+    """
+
+    if obs_metadata is None:
+        raise RuntimeError("Cannot call %s without an obs_metadata" % methodName)
+
+    if obs_metadata.site is None:
+        raise RuntimeError("Cannot call %s: obs_metadata has no site info" % methodName)
+
+    if obs_metadata.mjd is None:
+        raise RuntimeError("Cannot call %s: obs_metadata has no mjd" % methodName)
 
-        return numpy.degrees(output)
+    if len(ra)!=len(dec):
+        raise RuntimeError("You passed %d RAs but %d Decs to %s" % \
+                           (len(ra), len(dec), methodName))
 
 
 def _calculateObservatoryParameters(obs_metadata, wavelength, includeRefraction):
@@ -657,7 +1144,8 @@ def _calculateObservatoryParameters(obs_metadata, wavelength, includeRefraction)
     to include the effects of refraction
 
     @param [out] the numpy array of observatory paramters calculated by
-    palpy.aoppa
+    palpy.aoppa.  This array is cached and shared between callers, so it
+    is read-only.
     """
 
     # Correct site longitude for polar motion slaPolmo
@@ -682,38 +1170,77 @@ def _calculateObservatoryParameters(obs_metadata, wavelength, includeRefraction)
     #TODO: palpy.aoppa requires as its first argument
     #the UTC time expressed as an MJD.  It is not clear to me
     #how to actually calculate that.
-    if (includeRefraction == True):
-        obsPrms=palpy.aoppa(obs_metadata.mjd.UTC, obs_metadata.mjd.dut1,
-                          obs_metadata.site.longitude_rad,
-                          obs_metadata.site.latitude_rad,
-                          obs_metadata.site.height,
-                          xPolar,
-                          yPolar,
-                          obs_metadata.site.temperature_kelvin,
-                          obs_metadata.site.pressure,
-                          obs_metadata.site.humidity,
-                          wavelength ,
-                          obs_metadata.site.lapseRate)
-    else:
-        #we can discard refraction by setting pressure and humidity to zero
-        obsPrms=palpy.aoppa(obs_metadata.mjd.UTC, obs_metadata.mjd.dut1,
-                          obs_metadata.site.longitude_rad,
-                          obs_metadata.site.latitude_rad,
-                          obs_metadata.site.height,
-                          xPolar,
-                          yPolar,
-                          obs_metadata.site.temperature,
-                          0.0,
-                          0.0,
-                          wavelength ,
-                          obs_metadata.site.lapseRate)
+    #
+    #The final parameters are cached on their (scalar) inputs, since
+    #many catalogs are typically processed through the same
+    #obs_metadata.  The inputs are converted to floats so that they
+    #can be used as the cache key.
+    #(site and mjd are looked up once; every obs_metadata attribute
+    #access goes through a property)
+    site = obs_metadata.site
+    mjd = obs_metadata.mjd
+    return _observatoryParametersCached(float(mjd.UTC), float(mjd.dut1),
+                                        float(site.longitude_rad),
+                                        float(site.latitude_rad),
+                                        float(site.height),
+                                        xPolar,
+                                        yPolar,
+                                        float(site.temperature_kelvin),
+                                        float(site.pressure),
+                                        float(site.humidity),
+                                        float(wavelength),
+                                        float(site.lapseRate),
+                                        bool(includeRefraction))
+
+
+@_memoize(64)
+def _observatoryParametersCached(utc, dut1, longitude, latitude, height, xPolar, yPolar,
+                                 temperature, pressure, humidity, wavelength, lapseRate,
+                                 includeRefraction):
+    """
+    Cached implementation of _calculateObservatoryParameters.  The first
+    twelve arguments are those of palpy.aoppa.
 
+    @param [in] includeRefraction is a boolean indicating whether or not
+    to include the effects of refraction
+
+    @param [out] the numpy array of observatory parameters.  This array
+    is shared between callers, so it is read-only.
+    """
+    obsPrms=_aoppaCached(utc, dut1, longitude, latitude, height, xPolar, yPolar,
+                         temperature, pressure, humidity, wavelength, lapseRate)
+
+    if not includeRefraction:
+        #we can discard refraction by setting pressure and humidity to zero.
+        #None of the other parameters depend on them, so rather than calling
+        #palpy.aoppa a second time, zero out the pressure (element 6), the
+        #humidity (element 7) and the tan(z) and tan^3(z) refraction
+        #coefficients (elements 10 and 11) in a copy of the cached parameters
+        obsPrms = obsPrms.copy()
+        obsPrms[6] = 0.0
+        obsPrms[7] = 0.0
+        obsPrms[10] = 0.0
+        obsPrms[11] = 0.0
 
     return obsPrms
 
 
+@_memoize(32)
+def _aoppaCached(utc, dut1, longitude, latitude, height, xPolar, yPolar,
+                 temperature, pressure, humidity, wavelength, lapseRate):
+    """
+    Cached wrapper around palpy.aoppa (the arguments are those of palpy.aoppa).
+
+    @param [out] the numpy array of observatory parameters returned by
+    palpy.aoppa.  This array is shared between callers, so it is
+    read-only.
+    """
+    return palpy.aoppa(utc, dut1, longitude, latitude, height, xPolar, yPolar,
+                       temperature, pressure, humidity, wavelength, lapseRate)
+
+
 def _observedFromAppGeo(ra, dec, includeRefraction = True,
-                       altAzHr=False, wavelength=0.5, obs_metadata = None):
+                       altAzHr=False, wavelength=0.5, obs_metadata = None, out=None):
     """
     Convert apparent geocentric (RA, Dec) to observed (RA, Dec).  More specifically:
     apply refraction and diurnal aberration.
@@ -734,6 +1261,9 @@ def _observedFromAppGeo(ra, dec, includeRefraction = True,
     @param [in] obs_metadata is an ObservationMetaData characterizing the
     observation.
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the observed RA
     and the second row is the observed Dec (both in radians)
 
@@ -743,18 +1273,9 @@ def _observedFromAppGeo(ra, dec, includeRefraction = True,
 
     """
 
-    if obs_metadata is None:
-        raise RuntimeError("Cannot call observedFromAppGeo without an obs_metadata")
-
-    if obs_metadata.site is None:
-        raise RuntimeError("Cannot call observedFromAppGeo: obs_metadata has no site info")
-
-    if obs_metadata.mjd is None:
-        raise RuntimeError("Cannot call observedFromAppGeo: obs_metadata has no mjd")
-
-    if len(ra)!=len(dec):
-        raise RuntimeError("You passed %d RAs but %d Decs to observedFromAppGeo" % \
-                           (len(ra), len(dec)))
+    _validateObservedInputs(ra, dec, obs_metadata, 'observedFromAppGeo')
+    ra = _float64Array(ra, 'observedFromAppGeo')
+    dec = _float64Array(dec, 'observedFromAppGeo')
 
 
     obsPrms = _calculateObservatoryParameters(obs_metadata, wavelength, includeRefraction)
@@ -768,6 +1289,15 @@ def _observedFromAppGeo(ra, dec, includeRefraction = True,
     #for a large zenith distance)
     #
 
+    if len(ra) == 1:
+        # palpy's scalar routines skip the array handling of the vector
+        # routines, which is most of the cost for a single object
+        azimuth, zenith, hourAngle, decOut, raOut = palpy.aopqk(ra[0], dec[0], obsPrms)
+        if altAzHr == True:
+            az, alt = palpy.de2h(hourAngle, decOut, obs_metadata.site.latitude_rad)
+            return _raDecArray((raOut,), (decOut,), out=out), _raDecArray((alt,), (az,))
+        return _raDecArray((raOut,), (decOut,), out=out)
+
     azimuth, zenith, hourAngle, decOut, raOut = palpy.aopqkVector(ra,dec,obsPrms)
 
     #
@@ -776,18 +1306,21 @@ def _observedFromAppGeo(ra, dec, includeRefraction = True,
     #
     #Actually, this is only a choke point if you are dealing with zenith
     #distances of greater than about 70 degrees
+    #
+    #Note: palpy's vector routines do not release the GIL, so splitting
+    #the arrays across Python threads does not speed this up.
 
     if altAzHr == True:
         #
         #palpy.de2h converts equatorial to horizon coordinates
         #
         az, alt = palpy.de2hVector(hourAngle, decOut, obs_metadata.site.latitude_rad)
-        return numpy.array([raOut, decOut]), numpy.array([alt, az])
-    return numpy.array([raOut, decOut])
+        return _raDecArray(raOut, decOut, out=out), _raDecArray(alt, az)
+    return _raDecArray(raOut, decOut, out=out)
 
 
 def appGeoFromObserved(ra, dec, includeRefraction = True,
-                        wavelength=0.5, obs_metadata = None):
+                        wavelength=0.5, obs_metadata = None, out=None):
     """
     Convert observed (RA, Dec) to apparent geocentric (RA, Dec).  More
     specifically: undo the effects of refraction and diurnal aberration.
@@ -807,21 +1340,27 @@ def appGeoFromObserved(ra, dec, includeRefraction = True,
     @param [in] obs_metadata is an ObservationMetaData characterizing the
     observation.
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the apparent
     geocentric RA and the second row is the apparentGeocentric Dec (both
     in degrees)
     """
 
-    raOut, decOut = _appGeoFromObserved(numpy.radians(ra), numpy.radians(dec),
-                                        includeRefraction=includeRefraction,
-                                        wavelength=wavelength,
-                                        obs_metadata=obs_metadata)
+    raDec = _radiansBuffer(ra, dec, out, 'appGeoFromObserved')
+
+    output = _appGeoFromObserved(raDec[0], raDec[1],
+                                 includeRefraction=includeRefraction,
+                                 wavelength=wavelength,
+                                 obs_metadata=obs_metadata, out=raDec)
 
-    return numpy.array([numpy.degrees(raOut), numpy.degrees(decOut)])
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 def _appGeoFromObserved(ra, dec, includeRefraction = True,
-                        wavelength=0.5, obs_metadata = None):
+                        wavelength=0.5, obs_metadata = None, out=None):
     """
     Convert observed (RA, Dec) to apparent geocentric (RA, Dec).
     More specifically: undo the effects of refraction and diurnal aberration.
@@ -841,32 +1380,49 @@ def _appGeoFromObserved(ra, dec, includeRefraction = True,
     @param [in] obs_metadata is an ObservationMetaData characterizing the
     observation.
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the apparent
     geocentric RA and the second row is the apparentGeocentric Dec (both
     in radians)
     """
 
-    if obs_metadata is None:
-        raise RuntimeError("Cannot call appGeoFromObserved without an obs_metadata")
+    raOut, decOut = _appGeoFromObservedTuple(ra, dec, includeRefraction=includeRefraction,
+                                             wavelength=wavelength, obs_metadata=obs_metadata)
 
-    if obs_metadata.site is None:
-        raise RuntimeError("Cannot call appGeoFromObserved: obs_metadata has no site info")
+    return _raDecArray(raOut, decOut, out=out)
 
-    if obs_metadata.mjd is None:
-        raise RuntimeError("Cannot call appGeoFromObserved: obs_metadata has no mjd")
 
-    if len(ra)!=len(dec):
-        raise RuntimeError("You passed %d RAs but %d Decs to appGeoFromObserved" % \
-                           (len(ra), len(dec)))
+def _appGeoFromObservedTuple(ra, dec, includeRefraction = True,
+                             wavelength=0.5, obs_metadata = None):
+    """
+    Implementation of _appGeoFromObserved which returns the apparent
+    geocentric RA and Dec (in radians) as a tuple of two numpy arrays
+    exactly as palpy produces them.  This lets callers that immediately
+    unpack the result (e.g. _icrsFromObserved) skip stacking them into
+    a (2,N) array.
+
+    The arguments are the same as those of _appGeoFromObserved.
+    """
+
+    _validateObservedInputs(ra, dec, obs_metadata, 'appGeoFromObserved')
+    ra = _float64Array(ra, 'appGeoFromObserved')
+    dec = _float64Array(dec, 'appGeoFromObserved')
 
     obsPrms = _calculateObservatoryParameters(obs_metadata, wavelength, includeRefraction)
 
-    raOut, decOut = palpy.oapqkVector('r', ra, dec, obsPrms)
-    return numpy.array([raOut, decOut])
+    if len(ra) == 1:
+        # palpy's scalar routines skip the array handling of the vector
+        # routines, which is most of the cost for a single object
+        raOut, decOut = palpy.oapqk('r', ra[0], dec[0], obsPrms)
+        return numpy.array([raOut]), numpy.array([decOut])
+
+    return palpy.oapqkVector('r', ra, dec, obsPrms)
 
 
 def observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=None,
-                     obs_metadata=None, epoch=None, includeRefraction=True):
+                     obs_metadata=None, epoch=None, includeRefraction=True, out=None):
     """
     Convert mean position (RA, Dec) in the International Celestial Reference Frame
     to observed (RA, Dec).
@@ -896,6 +1452,9 @@ def observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=None
 
     @param [in] includeRefraction toggles whether or not to correct for refraction
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the observed
     RA and the second row is the observed Dec (both in degrees)
     """
@@ -915,17 +1474,20 @@ def observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=None
     else:
         parallax_in = None
 
-    output = _observedFromICRS(numpy.radians(ra), numpy.radians(dec),
+    raDec = _radiansBuffer(ra, dec, out, 'observedFromICRS')
+
+    output = _observedFromICRS(raDec[0], raDec[1],
                                pm_ra=pm_ra_in, pm_dec=pm_dec_in, parallax=parallax_in,
                                v_rad=v_rad, obs_metadata=obs_metadata, epoch=epoch,
-                               includeRefraction=includeRefraction)
+                               includeRefraction=includeRefraction, out=raDec)
 
-    return numpy.degrees(output)
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
 
 def _observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=None,
-                     obs_metadata=None, epoch=None, includeRefraction=True):
+                     obs_metadata=None, epoch=None, includeRefraction=True, out=None):
     """
     Convert mean position (RA, Dec) in the International Celestial Reference Frame
     to observed (RA, Dec)-like coordinates.
@@ -955,6 +1517,9 @@ def _observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=Non
 
     @param [in] includeRefraction toggles whether or not to correct for refraction
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the observed
     RA and the second row is the observed Dec (both in radians)
 
@@ -963,7 +1528,8 @@ def _observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=Non
     if obs_metadata is None:
         raise RuntimeError("cannot call observedFromICRS; obs_metadata is none")
 
-    if obs_metadata.mjd is None:
+    mjd = obs_metadata.mjd
+    if mjd is None:
         raise RuntimeError("cannot call observedFromICRS; obs_metadata.mjd is none")
 
     if epoch is None:
@@ -973,16 +1539,15 @@ def _observedFromICRS(ra, dec, pm_ra=None, pm_dec=None, parallax=None, v_rad=Non
         raise RuntimeError("You passed %d RAs but %d Decs to observedFromICRS" % \
                            (len(ra), len(dec)))
 
-    ra_apparent, dec_apparent = _appGeoFromICRS(ra, dec, pm_ra = pm_ra,
-             pm_dec = pm_dec, parallax = parallax, v_rad = v_rad, epoch = epoch, mjd=obs_metadata.mjd)
-
-    ra_out, dec_out = _observedFromAppGeo(ra_apparent, dec_apparent, obs_metadata=obs_metadata,
-                                               includeRefraction = includeRefraction)
+    ra_apparent, dec_apparent = _appGeoFromICRSTuple(ra, dec, pm_ra = pm_ra,
+             pm_dec = pm_dec, parallax = parallax, v_rad = v_rad, epoch = epoch, mjd=mjd)
 
-    return numpy.array([ra_out,dec_out])
+    #_observedFromAppGeo already returns a fresh (2,N) array
+    return _observedFromAppGeo(ra_apparent, dec_apparent, obs_metadata=obs_metadata,
+                               includeRefraction = includeRefraction, out=out)
 
 
-def icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=True):
+def icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=True, out=None):
     """
     Convert observed RA, Dec into mean International Celestial Reference Frame (ICRS)
     RA, Dec.  This method undoes the effects of precession, nutation, aberration (annual
@@ -1008,18 +1573,25 @@ def icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=T
 
     @param [in] includeRefraction toggles whether or not to correct for refraction
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the mean ICRS
     RA and the second row is the mean ICRS Dec (both in degrees)
     """
 
-    ra_out, dec_out = _icrsFromObserved(numpy.radians(ra), numpy.radians(dec),
-                                        obs_metadata=obs_metadata,
-                                        epoch=epoch, includeRefraction=includeRefraction)
+    raDec = _radiansBuffer(ra, dec, out, 'icrsFromObserved')
+
+    output = _icrsFromObserved(raDec[0], raDec[1],
+                               obs_metadata=obs_metadata,
+                               epoch=epoch, includeRefraction=includeRefraction,
+                               out=raDec)
 
-    return numpy.array([numpy.degrees(ra_out), numpy.degrees(dec_out)])
+    # convert in place rather than allocating another array
+    return numpy.degrees(output, out=output)
 
 
-def _icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=True):
+def _icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=True, out=None):
     """
     Convert observed RA, Dec into mean International Celestial Reference Frame (ICRS)
     RA, Dec.  This method undoes the effects of precession, nutation, aberration (annual
@@ -1045,6 +1617,9 @@ def _icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=
 
     @param [in] includeRefraction toggles whether or not to correct for refraction
 
+    @param [in] out is an optional (2,N) numpy array into which the output
+    will be written (default: None, in which case a new array is allocated)
+
     @param [out] a 2-D numpy array in which the first row is the mean ICRS
     RA and the second row is the mean ICRS Dec (both in radians)
     """
@@ -1052,7 +1627,8 @@ def _icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=
     if obs_metadata is None:
         raise RuntimeError("cannot call icrsFromObserved; obs_metadata is None")
 
-    if obs_metadata.mjd is None:
+    mjd = obs_metadata.mjd
+    if mjd is None:
         raise RuntimeError("cannot call icrsFromObserved; obs_metadata.mjd is None")
 
     if epoch is None:
@@ -1063,10 +1639,9 @@ def _icrsFromObserved(ra, dec, obs_metadata=None, epoch=None, includeRefraction=
                            (len(ra), len(dec)))
 
 
-    ra_app, dec_app = _appGeoFromObserved(ra, dec, obs_metadata=obs_metadata,
-                                          includeRefraction=includeRefraction)
-
-    ra_icrs, dec_icrs = _icrsFromAppGeo(ra_app, dec_app, epoch=epoch,
-                                        mjd=obs_metadata.mjd)
+    ra_app, dec_app = _appGeoFromObservedTuple(ra, dec, obs_metadata=obs_metadata,
+                                               includeRefraction=includeRefraction)
 
-    return numpy.array([ra_icrs, dec_icrs])
+    #_icrsFromAppGeo already returns a fresh (2,N) array
+    return _icrsFromAppGeo(ra_app, dec_app, epoch=epoch,
+                           mjd=mjd, out=out)
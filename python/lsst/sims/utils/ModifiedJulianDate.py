@@ -8,6 +8,41 @@ from lsst.utils import getPackageDir
 
 __all__ = ["ModifiedJulianDate"]
 
+class _cachedProperty(object):
+    """
+    Decorator for a read-only attribute that is computed by the decorated
+    method the first time it is accessed.  The result is stored in the
+    private instance attribute attrName, which is returned by later
+    accesses.  Assigning to the attribute raises an AttributeError, as it
+    would for a property without a setter.
+
+    (functools.cached_property does not exist in Python 2)
+
+    @param [in] attrName is the name of the private attribute in which
+    the value is cached
+    """
+
+    def __init__(self, attrName):
+        self.attrName = attrName
+
+    def __call__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        return self
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        cache = instance.__dict__
+        if self.attrName not in cache:
+            cache[self.attrName] = self.func(instance)
+        return cache[self.attrName]
+
+    def __set__(self, instance, value):
+        raise AttributeError("can't set attribute")
+
+
 class ModifiedJulianDate(object):
 
 
@@ -26,103 +61,150 @@ class ModifiedJulianDate(object):
             raise RuntimeError("You must specify either TAI or UTC to "
                                "instantiate ModifiedJulianDate")
 
+        # the time scale that was passed in is stored directly in the
+        # private attribute backing its (read-only) property; the others
+        # (and the astropy Time object used to compute them) are
+        # constructed the first time they are used
         if TAI is not None:
-            self._time = Time(TAI, scale='tai', format='mjd')
+            self._inputScale = 'tai'
             self._tai = TAI
-            self._utc = None
         else:
-            self._time = Time(UTC, scale='utc', format='mjd')
+            self._inputScale = 'utc'
             self._utc = UTC
-            self._tai = None
 
-        self._tt = None
-        self._tdb = None
-        self._ut1 = None
-        self._dut1 = None
+
+    @classmethod
+    def fromArray(cls, TAI=None, UTC=None):
+        """
+        Instantiate a ModifiedJulianDate representing many dates at once,
+        so that each time scale is computed by astropy in a single call
+        for all of the dates rather than once per date.
+
+        Must specify either:
+
+        @param [in] TAI = a numpy array of International Atomic Times as MJDs
+
+        or
+
+        @param [in] UTC = a numpy array of Universal Coordinate Times as MJDs
+
+        @param [out] a ModifiedJulianDate whose TAI, UTC, UT1, TT, TDB
+        and dut1 are all numpy arrays
+        """
+
+        if TAI is not None:
+            TAI = np.array(TAI, dtype=float, ndmin=1)
+
+        if UTC is not None:
+            UTC = np.array(UTC, dtype=float, ndmin=1)
+
+        return cls(TAI=TAI, UTC=UTC)
 
 
     def __eq__(self, other):
-        return self._time == other._time
+        if self._inputScale == other._inputScale:
+            # no need to build the astropy Time objects to compare
+            # dates supplied on the same time scale
+            if self._inputScale == 'tai':
+                return self._tai == other._tai
+            return self._utc == other._utc
+
+        return self.TAI == other.TAI
+
 
+    def __ne__(self, other):
+        return np.logical_not(self == other)
 
-    @property
+
+    def __hash__(self):
+        if np.ndim(self._utc if self._inputScale == 'utc' else self._tai) != 0:
+            # like numpy arrays, instances holding many dates (see fromArray)
+            # compare elementwise, and so cannot be hashed
+            raise TypeError("unhashable type: ModifiedJulianDate holding an array of dates")
+
+        return hash(round(self.TAI, 9))
+
+
+    @_cachedProperty('_astropyTime')
+    def _time(self):
+        """
+        The astropy.time.Time object used to convert between time scales
+        """
+        if self._inputScale == 'tai':
+            return Time(self._tai, scale='tai', format='mjd')
+        return Time(self._utc, scale='utc', format='mjd')
+
+
+    @_cachedProperty('_tai')
     def TAI(self):
         """
         International Atomic Time as an MJD
         """
-        if self._tai is None:
-            self._tai = self._time.tai.mjd
+        return self._time.tai.mjd
 
-        return self._tai
 
-
-    @property
+    @_cachedProperty('_utc')
     def UTC(self):
         """
         Universal Coordinate Time as an MJD
         """
-        if self._utc is None:
-            self._utc = self._time.utc.mjd
-
-        return self._utc
+        return self._time.utc.mjd
 
 
 
-    @property
+    @_cachedProperty('_ut1')
     def UT1(self):
         """
         Universal Time as an MJD
         """
-        if self._ut1 is None:
-            try:
-                self._ut1 = self._time.ut1.mjd
-            except:
-                warnings.warn("UTC %e is outside of IERS table for UT1-UTC.\n" % self.UTC
-                              + "Returning UT1 = UTC for lack of a better idea")
-                self._ut1 = self.UTC
+        dut1 = self.dut1
+        if self._dut1InRange:
+            return self._time.ut1.mjd
 
-        return self._ut1
+        # dut1 is zero for the dates outside of the IERS table
+        return self.UTC + dut1/86400.0
 
 
-    @property
+    @_cachedProperty('_dut1')
     def dut1(self):
         """
         UT1-UTC in seconds
         """
 
-        if self._dut1 is None:
-            try:
-                intermediate_value = self._time.get_delta_ut1_utc()
-                try:
-                    self._dut1 = intermediate_value.value
-                except:
-                    self._dut1 = intermediate_value
-            except:
-                warnings.warn("UTC %e is outside of IERS table for UT1-UTC.\n" % self.UTC
-                              + "Returning UT1 = UTC for lack of a better idea")
-                self._dut1 = 0.0
+        # ask astropy for the status of the interpolation rather than
+        # letting it raise an IERSRangeError for dates outside of the
+        # IERS table
+        dut1, status = self._time.get_delta_ut1_utc(return_status=True)
+        dut1 = getattr(dut1, 'value', dut1)
 
-        return self._dut1
+        # negative status values flag dates before or after the IERS table
+        outOfRange = status < 0
+        self._dut1InRange = not np.any(outOfRange)
+        if self._dut1InRange:
+            return dut1
 
+        if isinstance(self.UTC, np.ndarray):
+            warnings.warn("%d UTC values are outside of IERS table for UT1-UTC.\n" % outOfRange.sum()
+                          + "Returning UT1 = UTC for those dates for lack of a better idea")
+            return np.where(outOfRange, 0.0, dut1)
 
-    @property
+        warnings.warn("UTC %e is outside of IERS table for UT1-UTC.\n" % self.UTC
+                      + "Returning UT1 = UTC for lack of a better idea")
+        return 0.0
+
+
+    @_cachedProperty('_tt')
     def TT(self):
         """
         Terrestrial Time (aka Terrestrial Dynamical Time) as an MJD
         """
-        if self._tt is None:
-            self._tt = self._time.tt.mjd
+        return self._time.tt.mjd
 
-        return self._tt
 
-
-    @property
+    @_cachedProperty('_tdb')
     def TDB(self):
         """
         Barycentric Dynamical Time as an MJD
         """
-        if self._tdb is None:
-            self._tdb = self._time.tdb.mjd
-
-        return self._tdb
+        return self._time.tdb.mjd
 
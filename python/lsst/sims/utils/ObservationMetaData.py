@@ -1,3 +1,4 @@
+import math
 import numpy
 import inspect
 from .SpatialBounds import SpatialBounds
@@ -6,6 +7,92 @@ from lsst.sims.utils import Site
 
 __all__ = ["ObservationMetaData"]
 
+# the keys of phoSimMetaData which are copied into (or, in the case of
+# Opsim_rawseeing, protect) member variables of ObservationMetaData
+_phoSimMemberKeys = frozenset(['Opsim_expmjd', 'Opsim_rotskypos', 'Opsim_filter',
+                               'Opsim_rawseeing', 'pointingRA', 'pointingDec'])
+
+
+def _radiansFromDegrees(value):
+    """
+    Convert value from degrees to radians.  Scalars are converted with
+    math.radians, which avoids the overhead of calling a numpy ufunc on a
+    single number; lists and arrays (e.g. a 'box' boundLength) are
+    converted with numpy.radians.
+    """
+    if isinstance(value, (int, float)):
+        return math.radians(value)
+    return numpy.radians(value)
+
+
+def _degreesFromRadians(value):
+    """
+    Convert value from radians to degrees (see _radiansFromDegrees)
+    """
+    if isinstance(value, (int, float)):
+        return math.degrees(value)
+    return numpy.degrees(value)
+
+def _dictKeyedToBandpass(bandpass, inputValue, inputName):
+    """
+    Set up a dict of either m5 or seeing values (or any other quantity
+    keyed to bandpassName).  It reads in a list of values and associates them with
+    the list of bandpass names in bandpass.
+
+    This is a function of its arguments only (rather than a method reading
+    ObservationMetaData._bandpass), so that calling it does not require
+    binding a method or looking up attributes on the ObservationMetaData.
+
+    @param [in] bandpass is the bandpass name or list of bandpass names of the
+    ObservationMetaData.  An exception is raised if it is None.
+
+    @param [in] inputValue is a single value or list of m5/seeing/etc. corresponding to
+    the bandpasses in bandpass
+
+    @param [in] inputName is the name of the paramter stored in inputValue
+    (for constructing helpful error message)
+
+    @param [out] returns a dict of inputValue values keed to bandpass
+    """
+
+    if inputValue is None:
+        return None
+
+    if bandpass is None:
+        raise RuntimeError('You cannot set %s if you have not set ' % inputName +
+                           'bandpass in ObservationMetaData')
+
+    # strings are iterable, but a string is a single bandpass name
+    bandpassIsList = isinstance(bandpass, (list, tuple, numpy.ndarray))
+    inputIsList = isinstance(inputValue, (list, tuple, numpy.ndarray))
+
+    if bandpassIsList and not inputIsList:
+        raise RuntimeError('You passed a list of bandpass names' + \
+                           'but did not pass a list of %s to ObservationMetaData' % inputName)
+
+    if inputIsList and not bandpassIsList:
+        raise RuntimeError('You passed a list of %s ' % inputName + \
+                            'but did not pass a list of bandpass names to ObservationMetaData')
+
+
+    if inputIsList:
+        if len(inputValue) != len(bandpass):
+            raise RuntimeError('The list of %s you passed to ObservationMetaData ' % inputName + \
+                               'has a different length than the list of bandpass names you passed')
+
+    #now build the dict
+    if bandpassIsList:
+        if len(inputValue) != len(bandpass):
+            raise RuntimeError('In ObservationMetaData you tried to assign bandpass ' +
+                               'and %s with lists of different length' % inputName)
+
+        outputDict = dict(zip(bandpass, inputValue))
+    else:
+        outputDict = {bandpass:inputValue}
+
+    return outputDict
+
+
 class ObservationMetaData(object):
     """Observation Metadata
 
@@ -45,7 +132,9 @@ class ObservationMetaData(object):
           denoting the bandpasses used for this particular observation
 
         * phoSimMetaData : dict (optional)
-          a dictionary containing metadata used by PhoSim
+          a dictionary containing metadata used by PhoSim.  Note that, unlike the
+          kwargs above, the angles in this dict ('pointingRA', 'pointingDec' and
+          'Opsim_rotskypos') are in radians, as they are in OpSim
 
         * m5: float or list (optional)
           this should be the 5-sigma limiting magnitude in the bandpass or
@@ -90,12 +179,23 @@ class ObservationMetaData(object):
                     boundLength=5.0)
 
     """
+
+    # ObservationMetaData are created once per pointing, so their attributes
+    # are stored in slots rather than in a per-instance __dict__
+    __slots__ = ('_bounds', '_boundsDirty', '_summary', '_boundType', '_bandpass',
+                 '_skyBrightness', '_site', '_epoch', '_mjd',
+                 '_rotSkyPos', '_rotSkyPosDeg', '_pointingRA', '_pointingRADeg',
+                 '_pointingDec', '_pointingDecDeg', '_boundLength', '_boundLengthDeg',
+                 '_phoSimMetaData', '_m5', '_seeing')
+
     def __init__(self, boundType=None, boundLength=None,
                  mjd=None, pointingRA=None, pointingDec=None, rotSkyPos=None,
                  bandpassName=None, phoSimMetaData=None, site=Site(name='LSST'), m5=None, skyBrightness=None,
                  seeing=None, epoch=2000.0):
 
         self._bounds = None
+        self._boundsDirty = True
+        self._summary = None
         self._boundType = boundType
         self._bandpass = bandpassName
         self._skyBrightness = skyBrightness
@@ -103,42 +203,53 @@ class ObservationMetaData(object):
         self._epoch = epoch
 
         if mjd is not None:
-            if isinstance(mjd, float) or isinstance(mjd, int):
-                self._mjd = ModifiedJulianDate(TAI=mjd)
-            elif isinstance(mjd, ModifiedJulianDate):
+            if isinstance(mjd, ModifiedJulianDate):
                 self._mjd = mjd
+            elif isinstance(mjd, (int, float)):
+                self._mjd = ModifiedJulianDate(TAI=mjd)
             else:
                 raise RuntimeError("You must pass either a float or a ModifiedJulianDate "
                                    "as the kwarg mjd to ObservationMetaData")
         else:
             self._mjd = None
 
+        # angles are stored both in radians (used internally and by other
+        # modules) and in degrees (returned by the public properties) so
+        # that reading them does not require a conversion
         if rotSkyPos is not None:
-            self._rotSkyPos = numpy.radians(rotSkyPos)
+            self._rotSkyPos = _radiansFromDegrees(rotSkyPos)
+            self._rotSkyPosDeg = _degreesFromRadians(self._rotSkyPos)
         else:
             self._rotSkyPos = None
+            self._rotSkyPosDeg = None
 
         if pointingRA is not None:
-            self._pointingRA = numpy.radians(pointingRA)
+            self._pointingRA = _radiansFromDegrees(pointingRA)
+            self._pointingRADeg = _degreesFromRadians(self._pointingRA)
         else:
             self._pointingRA = None
+            self._pointingRADeg = None
 
         if pointingDec is not None:
-            self._pointingDec = numpy.radians(pointingDec)
+            self._pointingDec = _radiansFromDegrees(pointingDec)
+            self._pointingDecDeg = _degreesFromRadians(self._pointingDec)
         else:
             self._pointingDec = None
+            self._pointingDecDeg = None
 
         if boundLength is not None:
-            self._boundLength = numpy.radians(boundLength)
+            self._boundLength = _radiansFromDegrees(boundLength)
+            self._boundLengthDeg = _degreesFromRadians(self._boundLength)
         else:
             self._boundLength = None
+            self._boundLengthDeg = None
 
         if phoSimMetaData is not None:
             self._assignPhoSimMetaData(phoSimMetaData)
         else:
             self._phoSimMetaData = None
 
-        self._m5 = self._assignDictKeyedToBandpass(m5, 'm5')
+        self._m5 = _dictKeyedToBandpass(self._bandpass, m5, 'm5')
 
         # 11 June 2015
         # I think it is okay to assign seeing after _phoSimMetaData has been
@@ -147,16 +258,36 @@ class ObservationMetaData(object):
         # from seeing.  After instantiation, I don't think users should be
         # allowed to set seeing (on the assumption that seeing and rawseeing are
         # somehow in sync).
-        self._seeing = self._assignDictKeyedToBandpass(seeing, 'seeing')
+        self._seeing = _dictKeyedToBandpass(self._bandpass, seeing, 'seeing')
 
-        #this should be done after phoSimMetaData is assigned, just in case
-        #self._assignPhoSimMetadata overwrites pointingRA/Dec
-        if self._bounds is None:
-            self._buildBounds()
+        # self._bounds is built the first time it is requested (see the
+        # bounds property), since many ObservationMetaData are never used
+        # to query a database
+
+
+    def __getstate__(self):
+        # classes with __slots__ need this to be pickled under Python 2
+        return dict((name, getattr(self, name)) for name in self.__slots__
+                    if hasattr(self, name))
+
+    def __setstate__(self, state):
+        for name in state:
+            setattr(self, name, state[name])
 
 
     @property
     def summary(self):
+        """
+        A dict summarizing this ObservationMetaData.
+
+        The values are gathered the first time it is requested and then
+        reused until one of the parameters it summarizes is changed.  Each
+        request returns a new copy of the dict, which the caller is free
+        to modify.
+        """
+        if self._summary is not None:
+            return dict(self._summary)
+
         mydict = {}
         mydict['site'] = self.site
 
@@ -177,79 +308,21 @@ class ObservationMetaData(object):
 
         mydict['phoSimMetaData'] = self.phoSimMetaData
 
-        return mydict
-
-    def _assignDictKeyedToBandpass(self, inputValue, inputName):
-        """
-        This method sets up a dict of either m5 or seeing values (or any other quantity
-        keyed to bandpassName).  It reads in a list of values and associates them with
-        the list of bandpass names in self._bandpass.
-
-        Note: this method assumes that self._bandpass has already been set.
-        It will raise an exception of self._bandpass is None.
-
-        @param [in] inputValue is a single value or list of m5/seeing/etc. corresponding to
-        the bandpasses stored in self._bandpass
-
-        @param [in] inputName is the name of the paramter stored in inputValue
-        (for constructing helpful error message)
-
-        @param [out] returns a dict of inputValue values keed to self._bandpass
-        """
-
-        if inputValue is None:
-            return None
-        else:
-            bandpassIsList = False
-            inputIsList = False
-
-            if self._bandpass is None:
-                raise RuntimeError('You cannot set %s if you have not set ' % inputName +
-                                   'bandpass in ObservationMetaData')
-
-            if hasattr(self._bandpass, '__iter__'):
-                bandpassIsList = True
-
-            if hasattr(inputValue, '__iter__'):
-                inputIsList = True
-
-            if bandpassIsList and not inputIsList:
-                raise RuntimeError('You passed a list of bandpass names' + \
-                                   'but did not pass a list of %s to ObservationMetaData' % inputName)
-
-            if inputIsList and not bandpassIsList:
-                raise RuntimeError('You passed a list of %s ' % inputName + \
-                                    'but did not pass a list of bandpass names to ObservationMetaData')
-
-
-            if inputIsList:
-                if len(inputValue) != len(self._bandpass):
-                    raise RuntimeError('The list of %s you passed to ObservationMetaData ' % inputName + \
-                                       'has a different length than the list of bandpass names you passed')
-
-            #now build the dict
-            if bandpassIsList:
-                if len(inputValue) != len(self._bandpass):
-                    raise RuntimeError('In ObservationMetaData you tried to assign bandpass ' +
-                                       'and %s with lists of different length' % inputName)
-
-                outputDict = {}
-                for b, m in zip(self._bandpass, inputValue):
-                    outputDict[b] = m
-            else:
-                outputDict = {self._bandpass:inputValue}
-
-            return outputDict
-
+        self._summary = mydict
+        return dict(mydict)
 
     def _buildBounds(self):
         """
         Set up the member variable self._bounds.
 
-        If self._boundType, self._boundLength, self._pointingRA, or
-        self._pointingDec are None, nothing will happen.
+        If none of the parameters defining the bounds have changed since
+        the bounds were last built, or if self._boundType, self._boundLength,
+        self._pointingRA, or self._pointingDec are None, nothing will happen.
         """
 
+        if not self._boundsDirty:
+            return
+
         if self._boundType is None:
             return
 
@@ -261,6 +334,7 @@ class ObservationMetaData(object):
 
         self._bounds = SpatialBounds.getSpatialBounds(self._boundType, self._pointingRA, self._pointingDec,
                                                       self._boundLength)
+        self._boundsDirty = False
 
 
     def _assignPhoSimMetaData(self, metaData):
@@ -271,47 +345,59 @@ class ObservationMetaData(object):
         MJD, and bandpass from the metaData (if present) to the corresponding
         member variables.  If by doing so you try to overwrite a parameter that you
         have already set by hand, this method will raise an exception.
+
+        The angles in metaData are in radians (as in OpSim), which are the units
+        of the member variables, so they are stored without conversion.
         """
 
         self._phoSimMetaData = metaData
+        self._summary = None
 
         if self._phoSimMetaData is not None:
+            # find which of the keys that set member variables are present
+            # with one pass, rather than probing the dict for each of them
+            keys = _phoSimMemberKeys.intersection(self._phoSimMetaData)
+
             #overwrite member variables with values from the phoSimMetaData
-            if 'Opsim_expmjd' in self._phoSimMetaData:
+            if 'Opsim_expmjd' in keys:
                 if self._mjd is not None:
                     raise RuntimeError('WARNING in ObservationMetaData trying to overwrite mjd with phoSimMetaData')
 
                 self._mjd = ModifiedJulianDate(TAI=self._phoSimMetaData['Opsim_expmjd'][0])
 
-            if 'Opsim_rotskypos' in self._phoSimMetaData:
+            if 'Opsim_rotskypos' in keys:
                 if self._rotSkyPos is not None:
                     raise RuntimeError('WARNING in ObservationMetaData trying to overwrite rotSkyPos ' +
                                        'with phoSimMetaData')
 
                 self._rotSkyPos = self._phoSimMetaData['Opsim_rotskypos'][0]
+                self._rotSkyPosDeg = _degreesFromRadians(self._rotSkyPos)
 
 
-            if 'Opsim_filter' in self._phoSimMetaData:
+            if 'Opsim_filter' in keys:
                 if self._bandpass is not None:
                     raise RuntimeError('WARNING in ObservationMetaData trying to overwrite bandpass ' +
                                        'with phoSimMetaData')
 
                 self._bandpass = self._phoSimMetaData['Opsim_filter'][0]
 
-            if 'Opsim_rawseeing' in self._phoSimMetaData:
+            if 'Opsim_rawseeing' in keys:
                 if hasattr(self, '_seeing') and self._seeing is not None:
                     raise RuntimeError('WARNING in ObservationMetaDAta trying to overwrite seeing ' +
                                        'with phoSimMetaData')
 
-            if 'pointingDec' in self._phoSimMetaData and 'pointingRA' not in self._phoSimMetaData:
+            hasRA = 'pointingRA' in keys
+            hasDec = 'pointingDec' in keys
+
+            if hasDec and not hasRA:
                 raise RuntimeError("In ObservationMetaData, your phoSimMetaData specifies pointingDec, "
                                    "but not pointingRA")
 
-            if 'pointingRA' in self._phoSimMetaData and 'pointingDec' not in self._phoSimMetaData:
+            if hasRA and not hasDec:
                 raise RuntimeError("In ObservationMetaData, your phoSimMetaData specifies pointingRA, "
                                    "but not pointingDec")
 
-            if 'pointingRA' in self._phoSimMetaData and 'pointingDec' in self._phoSimMetaData:
+            if hasRA and hasDec:
                 if self._pointingRA is not None:
                     raise RuntimeError('WARNING in ObservationMetaData trying to overwrite pointingRA ' +
                                        'with phoSimMetaData')
@@ -321,10 +407,12 @@ class ObservationMetaData(object):
                                        'with phoSimMetaData')
 
                 self._pointingRA = self._phoSimMetaData['pointingRA'][0]
+                self._pointingRADeg = _degreesFromRadians(self._pointingRA)
 
                 self._pointingDec = self._phoSimMetaData['pointingDec'][0]
+                self._pointingDecDeg = _degreesFromRadians(self._pointingDec)
 
-        self._buildBounds()
+        self._boundsDirty = True
 
     @property
     def pointingRA(self):
@@ -332,20 +420,19 @@ class ObservationMetaData(object):
         The RA of the telescope pointing in degrees
         (in the International Celestial Reference System).
         """
-        if self._pointingRA is not None:
-            return numpy.degrees(self._pointingRA)
-        else:
-            return None
+        return self._pointingRADeg
 
     @pointingRA.setter
     def pointingRA(self, value):
+        self._summary = None
         if self._phoSimMetaData is not None:
             if 'pointingRA' in self._phoSimMetaData:
                 raise RuntimeError('WARNING overwriting pointingRA ' +
                                    'which was set by phoSimMetaData')
 
-        self._pointingRA = numpy.radians(value)
-        self._buildBounds()
+        self._pointingRA = _radiansFromDegrees(value)
+        self._pointingRADeg = _degreesFromRadians(self._pointingRA)
+        self._boundsDirty = True
 
     @property
     def pointingDec(self):
@@ -353,20 +440,19 @@ class ObservationMetaData(object):
         The Dec of the telescope pointing in degrees
         (in the International Celestial Reference System).
         """
-        if self._pointingDec is not None:
-            return numpy.degrees(self._pointingDec)
-        else:
-            return None
+        return self._pointingDecDeg
 
     @pointingDec.setter
     def pointingDec(self, value):
+        self._summary = None
         if self._phoSimMetaData is not None:
             if 'pointingDec' in self._phoSimMetaData:
                 raise RuntimeError('WARNING overwriting pointingDec ' +
                                    'which was set by phoSimMetaData')
 
-        self._pointingDec = numpy.radians(value)
-        self._buildBounds()
+        self._pointingDec = _radiansFromDegrees(value)
+        self._pointingDecDeg = _degreesFromRadians(self._pointingDec)
+        self._boundsDirty = True
 
     @property
     def boundLength(self):
@@ -381,15 +467,14 @@ class ObservationMetaData(object):
         the length should be in radians.  The present class converts
         from degrees to radians before passing to SpatialBounds).
         """
-        if self._boundLength is None:
-            return None
-
-        return numpy.degrees(self._boundLength)
+        return self._boundLengthDeg
 
     @boundLength.setter
     def boundLength(self, value):
-        self._boundLength = numpy.radians(value)
-        self._buildBounds()
+        self._summary = None
+        self._boundLength = _radiansFromDegrees(value)
+        self._boundLengthDeg = _degreesFromRadians(self._boundLength)
+        self._boundsDirty = True
 
     @property
     def boundType(self):
@@ -401,8 +486,9 @@ class ObservationMetaData(object):
 
     @boundType.setter
     def boundType(self, value):
+        self._summary = None
         self._boundType = value
-        self._buildBounds()
+        self._boundsDirty = True
 
     @property
     def bounds(self):
@@ -410,7 +496,11 @@ class ObservationMetaData(object):
         Instantiation of a sub-class of SpatialBounds.  This
         is what actually construct the WHERE clause of the SQL
         query associated with this ObservationMetaData.
+
+        It is built the first time it is requested after the
+        parameters defining it have been set or changed.
         """
+        self._buildBounds()
         return self._bounds
 
     @property
@@ -419,19 +509,18 @@ class ObservationMetaData(object):
         The rotation of the telescope with respect to the sky in degrees.
         It is a parameter you should get from OpSim.
         """
-        if self._rotSkyPos is not None:
-            return numpy.degrees(self._rotSkyPos)
-        else:
-            return None
+        return self._rotSkyPosDeg
 
     @rotSkyPos.setter
     def rotSkyPos(self,value):
+        self._summary = None
         if self._phoSimMetaData is not None:
             if 'Opsim_rotskypos' in self._phoSimMetaData:
                 raise RuntimeError('WARNING overwriting rotSkyPos ' +
                                    'which was set by phoSimMetaData')
 
-        self._rotSkyPos = numpy.radians(value)
+        self._rotSkyPos = _radiansFromDegrees(value)
+        self._rotSkyPosDeg = _degreesFromRadians(self._rotSkyPos)
 
 
     @property
@@ -445,7 +534,7 @@ class ObservationMetaData(object):
 
     @m5.setter
     def m5(self, value):
-        self._m5 = self._assignDictKeyedToBandpass(value, 'm5')
+        self._m5 = _dictKeyedToBandpass(self._bandpass, value, 'm5')
 
 
     @property
@@ -463,7 +552,7 @@ class ObservationMetaData(object):
                 raise RuntimeError('In ObservationMetaData trying to overwrite seeing ' +
                                    'which was set by phoSimMetaData')
 
-        self._seeing = self._assignDictKeyedToBandpass(value, 'seeing')
+        self._seeing = _dictKeyedToBandpass(self._bandpass, value, 'seeing')
 
 
     @property
@@ -476,6 +565,7 @@ class ObservationMetaData(object):
 
     @site.setter
     def site(self, value):
+        self._summary = None
         self._site = value
 
     @property
@@ -491,15 +581,16 @@ class ObservationMetaData(object):
         Either a float or a ModifiedJulianDate.  If a float, this setter
         assumes that you are passing in International Atomic Time
         """
+        self._summary = None
         if self._phoSimMetaData is not None:
             if 'Opsim_expmjd' in self._phoSimMetaData:
                 raise RuntimeError('WARNING overwriting mjd ' +
                                    'which was set by phoSimMetaData')
 
-        if isinstance(value, float):
-            self._mjd = ModifiedJulianDate(TAI=value)
-        elif isinstance(value, ModifiedJulianDate):
+        if isinstance(value, ModifiedJulianDate):
             self._mjd = value
+        elif isinstance(value, (int, float)):
+            self._mjd = ModifiedJulianDate(TAI=value)
         else:
             raise RuntimeError("You can only set mjd to either a float or a ModifiedJulianDate")
 
@@ -543,8 +634,9 @@ class ObservationMetaData(object):
 
 
         self._bandpass = bandpassName
-        self._m5 = self._assignDictKeyedToBandpass(m5, 'm5')
-        self._seeing = self._assignDictKeyedToBandpass(seeing, 'seeing')
+        self._summary = None
+        self._m5 = _dictKeyedToBandpass(self._bandpass, m5, 'm5')
+        self._seeing = _dictKeyedToBandpass(self._bandpass, seeing, 'seeing')
 
     @property
     def skyBrightness(self):
@@ -556,6 +648,7 @@ class ObservationMetaData(object):
 
     @skyBrightness.setter
     def skyBrightness(self, value):
+        self._summary = None
         self._skyBrightness = value
 
     @property
@@ -573,12 +666,15 @@ class ObservationMetaData(object):
     def phoSimMetaData(self, value):
         if 'pointingRA' in value:
             self._pointingRA = None
+            self._pointingRADeg = None
 
         if 'pointingDec' in value:
             self._pointingDec = None
+            self._pointingDecDeg = None
 
         if 'Opsim_rotskypos' in value:
             self._rotSkyPos = None
+            self._rotSkyPosDeg = None
 
         if 'Opsim_expmjd' in value:
             self._mjd = None
@@ -76,8 +76,12 @@ def samplePatchOnSphere(phi, theta, delta, size, seed=1):
     theta = np.radians(theta)
     delta = np.radians(delta)
 
-    phivals = 2. * delta * u + (phi - delta)
-    phivals = np.where ( phivals >= 0., phivals, phivals + 2. * np.pi)
+    # the random draws are transformed in place, rather than allocating
+    # new arrays for each intermediate step
+    phivals = u
+    phivals *= 2. * delta
+    phivals += phi - delta
+    phivals[phivals < 0.] += 2. * np.pi
     
     # use conventions in spherical coordinates
     theta = np.pi/2.0 - theta
@@ -90,8 +94,11 @@ def samplePatchOnSphere(phi, theta, delta, size, seed=1):
 
     # Cumulative Density Function is cos(thetamin) - cos(theta) / cos(thetamin) - cos(thetamax)
     a = np.cos(thetamin) - np.cos(thetamax)
-    thetavals = np.arccos(-v * a + np.cos(thetamin))
+    thetavals = v
+    thetavals *= -a
+    thetavals += np.cos(thetamin)
+    np.arccos(thetavals, out=thetavals)
 
     # Get back to -pi/2 to pi/2 range of decs
-    thetavals = np.pi/2.0 - thetavals 
-    return np.degrees(phivals) , np.degrees(thetavals)
+    np.subtract(np.pi/2.0, thetavals, out=thetavals)
+    return np.degrees(phivals, out=phivals), np.degrees(thetavals, out=thetavals)
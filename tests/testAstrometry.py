@@ -34,10 +34,13 @@ from lsst.sims.utils import _getRotTelPos, _raDecFromAltAz, calcObsDefaults, \
 
 from lsst.sims.utils import solarRaDec, _solarRaDec, distanceToSun, _distanceToSun
 from lsst.sims.utils import _applyPrecession, _applyProperMotion
-from lsst.sims.utils import _appGeoFromICRS, _observedFromAppGeo
-from lsst.sims.utils import _observedFromICRS, _icrsFromObserved
+from lsst.sims.utils import _appGeoFromICRS, _observedFromAppGeo, _appGeoFromICRSBatch
+from lsst.sims.utils import appGeoFromICRS
+from lsst.sims.utils import _observedFromICRS, _icrsFromObserved, icrsFromObserved
 from lsst.sims.utils import _appGeoFromObserved, _icrsFromAppGeo
 from lsst.sims.utils import refractionCoefficients, applyRefraction
+from lsst.sims.utils.AstrometryUtils import _greatCircleDistance, _calculateObservatoryParameters, _mappaCached
+from lsst.sims.utils.AstrometryUtils import _prenutCached, _aoppaCached
 
 def makeObservationMetaData():
     #create a cartoon ObservationMetaData object
@@ -225,6 +228,30 @@ class astrometryUnitTest(unittest.TestCase):
             self.assertAlmostEqual(numpy.radians(dec_deg), dec_rad, 10)
 
 
+    def testSolarRaDecCache(self):
+        """
+        Test that repeated calls to _solarRaDec (which are served from a cache)
+        agree with the position calculated directly from palpy.mappa
+        """
+
+        for mjd, epoch in zip((57664.2, 53478.9, 57664.2), (2000.0, 2000.0, 1950.0)):
+            params = pal.mappa(epoch, mjd)
+            ra_control, dec_control = pal.dcc2s(-1.0*params[4:7])
+            for ix in range(2):
+                ra_rad, dec_rad = _solarRaDec(mjd, epoch=epoch)
+                self.assertAlmostEqual(ra_rad, ra_control, 12)
+                self.assertAlmostEqual(dec_rad, dec_control, 12)
+
+            # 0-d numpy arrays are not hashable, but must still be accepted
+            ra_rad, dec_rad = _solarRaDec(numpy.array(mjd), epoch=numpy.array(epoch))
+            self.assertAlmostEqual(ra_rad, ra_control, 12)
+            self.assertAlmostEqual(dec_rad, dec_control, 12)
+
+            dist = _distanceToSun(ra_control, dec_control, numpy.array(mjd),
+                                  epoch=numpy.array(epoch))
+            self.assertAlmostEqual(dist, 0.0, 12)
+
+
     def testDistanceToSunArray(self):
         """
         Test _distanceToSun on numpy arrays of RA, Dec using solar RA, Dec calculated from
@@ -256,6 +283,41 @@ class astrometryUnitTest(unittest.TestCase):
             distance_control = haversine(ra_list, dec_list, numpy.array([raS]*nStars), numpy.array([decS]*nStars))
             numpy.testing.assert_array_almost_equal(distance_list, distance_control, 5)
 
+        # make sure that catalogs large enough to be processed in blocks
+        # give the same answer as processing them all at once
+        nStars = 40000
+        ra_list = numpy.random.random_sample(nStars)*2.0*numpy.pi
+        dec_list =(numpy.random.random_sample(nStars)-0.5)*numpy.pi
+        distance_list = _distanceToSun(ra_list, dec_list, mjd_list[0])
+        sunRa, sunDec = _solarRaDec(mjd_list[0])
+        distance_control = _greatCircleDistance(ra_list, dec_list, sunRa, sunDec)
+        numpy.testing.assert_array_equal(distance_list, distance_control)
+
+
+    def testGreatCircleDistance(self):
+        """
+        Test that _greatCircleDistance agrees with haversine and stays
+        accurate for nearly antipodal points
+        """
+        numpy.random.seed(41)
+        nSamples = 100
+        ra1 = numpy.random.random_sample(nSamples)*2.0*numpy.pi
+        dec1 = (numpy.random.random_sample(nSamples)-0.5)*numpy.pi
+        ra2 = numpy.random.random_sample(nSamples)*2.0*numpy.pi
+        dec2 = (numpy.random.random_sample(nSamples)-0.5)*numpy.pi
+
+        numpy.testing.assert_array_almost_equal(_greatCircleDistance(ra1, dec1, ra2, dec2),
+                                                haversine(ra1, dec1, ra2, dec2), 10)
+
+        # points along the equator just short of 180 degrees apart
+        offset = numpy.array([1.0e-3, 1.0e-5, 1.0e-7, 1.0e-9])
+        distance = _greatCircleDistance(numpy.zeros(len(offset)), numpy.zeros(len(offset)),
+                                        numpy.pi-offset, numpy.zeros(len(offset)))
+        numpy.testing.assert_array_almost_equal(distance, numpy.pi-offset, 13)
+
+        # scalar inputs
+        self.assertAlmostEqual(_greatCircleDistance(0.1, 0.2, 0.1, 0.2), 0.0, 15)
+
 
     def testAstrometryExceptions(self):
         """
@@ -355,10 +417,15 @@ class astrometryUnitTest(unittest.TestCase):
                           mjd=ModifiedJulianDate(TAI=52000.0))
 
         #test that it actually runs
-        _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad,
-                           mjd=ModifiedJulianDate(TAI=52000.0))
-        _applyProperMotion(ra[0], dec[0], pm_ra[0], pm_dec[0], parallax[0], v_rad[0],
-                          mjd=ModifiedJulianDate(TAI=52000.0))
+        arrayOutput = _applyProperMotion(ra, dec, pm_ra, pm_dec, parallax, v_rad,
+                                         mjd=ModifiedJulianDate(TAI=52000.0))
+        scalarOutput = _applyProperMotion(ra[0], dec[0], pm_ra[0], pm_dec[0], parallax[0], v_rad[0],
+                                          mjd=ModifiedJulianDate(TAI=52000.0))
+
+        #test that scalar inputs give the same answer as arrays
+        self.assertEqual(scalarOutput.shape, (2,))
+        self.assertAlmostEqual(scalarOutput[0], arrayOutput[0][0], 12)
+        self.assertAlmostEqual(scalarOutput[1], arrayOutput[1][0], 12)
 
         ##########test _appGeoFromICRS
         #test without mjd
@@ -447,6 +514,39 @@ class astrometryUnitTest(unittest.TestCase):
         #just make sure it runs
         output=_applyPrecession(ra,dec, mjd=ModifiedJulianDate(TAI=57388.0))
 
+        #test against palpy.prenut directly; the second call is served
+        #from the cache of precession-nutation matrices
+        mjd = ModifiedJulianDate(TAI=57388.0)
+        rmat = pal.prenut(2000.0, mjd.TT)
+        for ix in range(2):
+            cachedOutput = _applyPrecession(ra, dec, mjd=mjd)
+            for raIn, decIn, raTest, decTest in zip(ra, dec, cachedOutput[0], cachedOutput[1]):
+                raControl, decControl = pal.dcc2s(numpy.dot(rmat, pal.dcs2c(raIn, decIn)))
+                self.assertAlmostEqual(numpy.cos(raTest), numpy.cos(raControl), 12)
+                self.assertAlmostEqual(numpy.sin(raTest), numpy.sin(raControl), 12)
+                self.assertAlmostEqual(decTest, decControl, 12)
+
+        #test that scalar inputs give the same answer as arrays
+        for ix in range(len(ra)):
+            scalarOutput = _applyPrecession(ra[ix], dec[ix], mjd=ModifiedJulianDate(TAI=57388.0))
+            self.assertEqual(scalarOutput.shape, (2,))
+            self.assertAlmostEqual(scalarOutput[0], output[0][ix], 12)
+            self.assertAlmostEqual(scalarOutput[1], output[1][ix], 12)
+
+        #test that list inputs return every point, not just the first
+        listOutput = _applyPrecession(list(ra), list(dec), mjd=ModifiedJulianDate(TAI=57388.0))
+        self.assertEqual(listOutput.shape, (2, len(ra)))
+        numpy.testing.assert_array_equal(listOutput, output)
+
+        #test that the single precision rotation agrees to within its
+        #documented accuracy
+        singleOutput = _applyPrecession(ra, dec, mjd=ModifiedJulianDate(TAI=57388.0),
+                                        singlePrecision=True)
+        self.assertEqual(singleOutput.dtype, numpy.float64)
+        distance = arcsecFromRadians(haversine(output[0], output[1],
+                                               singleOutput[0], singleOutput[1]))
+        self.assertLess(distance.max(), 0.1)
+
 
     def test_applyProperMotion(self):
         """
@@ -647,6 +747,104 @@ class astrometryUnitTest(unittest.TestCase):
             self.assertLess(distance, 0.1)
 
 
+    def test_appGeoFromICRSNoSpaceMotion(self):
+        """
+        Test that _appGeoFromICRS gives the same answer whether the absence of
+        space motion is indicated by None or by arrays of zeros
+        """
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        zeros = numpy.zeros(len(ra))
+        mjd = ModifiedJulianDate(TAI=57384.6)
+
+        control = _appGeoFromICRS(ra, dec, pm_ra=zeros, pm_dec=zeros, parallax=zeros,
+                                  v_rad=zeros, epoch=2000.0, mjd=mjd)
+
+        test = _appGeoFromICRS(ra, dec, epoch=2000.0, mjd=mjd)
+        distance = arcsecFromRadians(haversine(test[0], test[1], control[0], control[1]))
+        self.assertLess(distance.max(), 1.0e-6)
+
+        test = _appGeoFromICRSBatch(ra, dec, epoch=2000.0, mjdList=[mjd])
+        distance = arcsecFromRadians(haversine(test[0][0], test[0][1], control[0], control[1]))
+        self.assertLess(distance.max(), 1.0e-6)
+
+
+    def test_appGeoFromICRSIntegerParallax(self):
+        """
+        Test that appGeoFromICRS accepts an integer array of parallaxes
+        (in arcsec) and agrees with the same parallaxes passed as floats
+        """
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        ra = numpy.degrees(ra)
+        dec = numpy.degrees(dec)
+        parallaxInt = numpy.arange(len(ra)) % 3
+        mjd = ModifiedJulianDate(TAI=57384.6)
+
+        control = appGeoFromICRS(ra, dec, pm_ra=pm_ra, pm_dec=pm_dec,
+                                 parallax=parallaxInt.astype(float), v_rad=v_rad,
+                                 epoch=2000.0, mjd=mjd)
+
+        test = appGeoFromICRS(ra, dec, pm_ra=pm_ra, pm_dec=pm_dec,
+                              parallax=parallaxInt, v_rad=v_rad,
+                              epoch=2000.0, mjd=mjd)
+
+        numpy.testing.assert_array_equal(test, control)
+
+
+    def test_appGeoFromICRSBatch(self):
+        """
+        Test that _appGeoFromICRSBatch agrees with calling _appGeoFromICRS
+        once per date
+        """
+
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        pm_ra = radiansFromArcsec(pm_ra)
+        pm_dec = radiansFromArcsec(pm_dec)
+        parallax = radiansFromArcsec(parallax)
+
+        mjdList = [ModifiedJulianDate(TAI=tai) for tai in (52000.0, 53123.4, 57384.6)]
+
+        self.assertRaises(RuntimeError, _appGeoFromICRSBatch, ra, dec)
+        self.assertRaises(RuntimeError, _appGeoFromICRSBatch, ra, dec[:10],
+                          mjdList=mjdList)
+
+        output = _appGeoFromICRSBatch(ra, dec, pm_ra=pm_ra, pm_dec=pm_dec,
+                                      parallax=parallax, v_rad=v_rad,
+                                      epoch=2000.0, mjdList=mjdList)
+
+        self.assertEqual(output.shape, (len(mjdList), 2, len(ra)))
+
+        for ix, mjd in enumerate(mjdList):
+            control = _appGeoFromICRS(ra, dec, pm_ra=pm_ra, pm_dec=pm_dec,
+                                      parallax=parallax, v_rad=v_rad,
+                                      epoch=2000.0, mjd=mjd)
+
+            numpy.testing.assert_array_equal(output[ix], control)
+
+        # test that it runs without the optional arguments
+        output = _appGeoFromICRSBatch(ra, dec, mjdList=mjdList)
+        for ix, mjd in enumerate(mjdList):
+            control = _appGeoFromICRS(ra, dec, mjd=mjd)
+            numpy.testing.assert_array_equal(output[ix], control)
+
+        # test that a single ModifiedJulianDate holding all of the dates
+        # gives the same answer as a list of them
+        mjdArray = ModifiedJulianDate.fromArray(TAI=[52000.0, 53123.4, 57384.6])
+        arrayOutput = _appGeoFromICRSBatch(ra, dec, mjdList=mjdArray)
+        self.assertEqual(arrayOutput.shape, output.shape)
+        numpy.testing.assert_array_almost_equal(arrayOutput, output, 12)
+
+        # test that a batch with more dates than _mappaCached holds does
+        # not evict the entries cached for single-date callers
+        mjd = ModifiedJulianDate(TAI=51234.5)
+        _appGeoFromICRS(ra, dec, mjd=mjd)
+        self.assertIn((2000.0, mjd.TDB), _mappaCached.cache)
+        bigList = [ModifiedJulianDate(TAI=50000.0 + 3.1*ix) for ix in range(100)]
+        bigOutput = _appGeoFromICRSBatch(ra[:5], dec[:5], mjdList=bigList)
+        self.assertIn((2000.0, mjd.TDB), _mappaCached.cache)
+        for ix in (0, 64, 99):
+            control = _appGeoFromICRS(ra[:5], dec[:5], mjd=bigList[ix])
+            numpy.testing.assert_array_equal(bigOutput[ix], control)
+
 
     def test_icrsFromAppGeo(self):
         """
@@ -755,6 +953,86 @@ class astrometryUnitTest(unittest.TestCase):
                         self.assertLess(distance.max(), 0.01)
 
 
+    def test_outputBuffer(self):
+        """
+        Test that the transformations between ICRS and observed coordinates
+        can write into a (2,N) array supplied by the caller
+        """
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        obs = self.obs_metadata
+
+        buff = numpy.zeros((2, len(ra)))
+        control = _observedFromICRS(ra, dec, obs_metadata=obs, epoch=2000.0)
+        test = _observedFromICRS(ra, dec, obs_metadata=obs, epoch=2000.0, out=buff)
+        self.assertIs(test, buff)
+        numpy.testing.assert_array_equal(test, control)
+
+        # reuse the same buffer
+        control = _icrsFromObserved(ra, dec, obs_metadata=obs, epoch=2000.0)
+        test = _icrsFromObserved(ra, dec, obs_metadata=obs, epoch=2000.0, out=buff)
+        self.assertIs(test, buff)
+        numpy.testing.assert_array_equal(test, control)
+
+        control = icrsFromObserved(numpy.degrees(ra), numpy.degrees(dec),
+                                   obs_metadata=obs, epoch=2000.0)
+        test = icrsFromObserved(numpy.degrees(ra), numpy.degrees(dec),
+                                obs_metadata=obs, epoch=2000.0, out=buff)
+        self.assertIs(test, buff)
+        numpy.testing.assert_array_equal(test, control)
+
+        # test that a buffer of the wrong shape is rejected
+        self.assertRaises(RuntimeError, _observedFromICRS, ra, dec, obs_metadata=obs,
+                          epoch=2000.0, out=numpy.zeros((2, len(ra)-1)))
+        self.assertRaises(RuntimeError, _appGeoFromObserved, ra, dec, obs_metadata=obs,
+                          out=numpy.zeros((len(ra), 2)))
+
+
+    def test_singleObject(self):
+        """
+        Test that transforming a single object (which uses palpy's scalar
+        routines) gives the same result as transforming it as part of a
+        larger array
+        """
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        obs = self.obs_metadata
+
+        control = _observedFromICRS(ra, dec, obs_metadata=obs, epoch=2000.0)
+        test = _observedFromICRS(ra[3:4], dec[3:4], obs_metadata=obs, epoch=2000.0)
+        self.assertEqual(test.shape, (2, 1))
+        numpy.testing.assert_array_equal(test[:,0], control[:,3])
+
+        control = _icrsFromObserved(ra, dec, obs_metadata=obs, epoch=2000.0)
+        test = _icrsFromObserved(ra[3:4], dec[3:4], obs_metadata=obs, epoch=2000.0)
+        self.assertEqual(test.shape, (2, 1))
+        numpy.testing.assert_array_equal(test[:,0], control[:,3])
+
+        controlRaDec, controlAltAz = _observedFromAppGeo(ra, dec, obs_metadata=obs, altAzHr=True)
+        testRaDec, testAltAz = _observedFromAppGeo(ra[3:4], dec[3:4], obs_metadata=obs, altAzHr=True)
+        numpy.testing.assert_array_equal(testRaDec[:,0], controlRaDec[:,3])
+        numpy.testing.assert_array_equal(testAltAz[:,0], controlAltAz[:,3])
+
+
+    def test_float32Input(self):
+        """
+        Test that float32 inputs to the transformations between ICRS and
+        observed coordinates are upcast (with a warning) rather than
+        rejected by palpy
+        """
+        ra, dec, pm_ra, pm_dec, parallax, v_rad = makeRandomSample()
+        ra = ra.astype(numpy.float32)
+        dec = dec.astype(numpy.float32)
+        obs = self.obs_metadata
+
+        for method in (_observedFromICRS, _icrsFromObserved):
+            control = method(ra.astype(numpy.float64), dec.astype(numpy.float64),
+                             obs_metadata=obs, epoch=2000.0)
+            with warnings.catch_warnings(record=True) as ww:
+                warnings.simplefilter("always")
+                test = method(ra, dec, obs_metadata=obs, epoch=2000.0)
+            self.assertGreater(len(ww), 0)
+            numpy.testing.assert_array_equal(test, control)
+
+
     def test_icrsFromObservedExceptions(self):
         """
         Test that _icrsFromObserved raises exceptions when it is supposed to.
@@ -872,6 +1150,34 @@ class astrometryUnitTest(unittest.TestCase):
                          "You passed 2 RAs but 10 Decs to appGeoFromObserved")
 
 
+    def test_singleObjectMismatchedLength(self):
+        """
+        Test that the single-object paths of the transformations raise
+        exceptions when RA and Dec have different lengths
+        """
+        ra_in = numpy.array([0.1])
+        dec_in = numpy.array([0.1, 0.2])
+        mjd = ModifiedJulianDate(TAI=52000.0)
+        obs = ObservationMetaData(pointingRA=25.0, pointingDec=-12.0, mjd=mjd)
+
+        with self.assertRaises(RuntimeError) as context:
+            _icrsFromAppGeo(ra_in, dec_in, mjd=mjd)
+        self.assertEqual(context.exception.args[0],
+                         "You passed 1 RAs but 2 Decs to icrsFromAppGeo")
+
+        with self.assertRaises(RuntimeError) as context:
+            _observedFromAppGeo(ra_in, dec_in, obs_metadata=obs)
+        self.assertEqual(context.exception.args[0],
+                         "You passed 1 RAs but 2 Decs to observedFromAppGeo")
+
+        with self.assertRaises(RuntimeError) as context:
+            _appGeoFromObserved(ra_in, dec_in, obs_metadata=obs)
+        self.assertEqual(context.exception.args[0],
+                         "You passed 1 RAs but 2 Decs to appGeoFromObserved")
+
+        self.assertRaises(RuntimeError, _appGeoFromICRS, ra_in, dec_in, mjd=mjd)
+
+
     def testRefractionCoefficients(self):
         output=refractionCoefficients(wavelength=5000.0, site=self.obs_metadata.site)
 
@@ -885,6 +1191,60 @@ class astrometryUnitTest(unittest.TestCase):
 
         self.assertAlmostEqual(output,7.851689251070859132e-01,6)
 
+    def testObservatoryParameters(self):
+        """
+        Test that the (cached) observatory parameters agree with calling
+        palpy.aoppa directly, with and without refraction
+        """
+        site = self.obs_metadata.site
+        mjd = self.obs_metadata.mjd
+        for includeRefraction in (True, False, True, False):
+            if includeRefraction:
+                pressure = site.pressure
+                humidity = site.humidity
+            else:
+                pressure = 0.0
+                humidity = 0.0
+
+            control = pal.aoppa(mjd.UTC, mjd.dut1, site.longitude_rad, site.latitude_rad,
+                                site.height, 0.0, 0.0, site.temperature_kelvin,
+                                pressure, humidity, 0.5, site.lapseRate)
+
+            test = _calculateObservatoryParameters(self.obs_metadata, 0.5, includeRefraction)
+            numpy.testing.assert_array_almost_equal(test, control, 12)
+
+
+    def testCachedParametersReadOnly(self):
+        """
+        Test that the cached star-independent parameters cannot be modified
+        in place by a caller
+        """
+        site = self.obs_metadata.site
+        mjd = self.obs_metadata.mjd
+
+        cachedList = [_mappaCached(2000.0, mjd.TDB), _prenutCached(2000.0, mjd.TT),
+                      _aoppaCached(mjd.UTC, mjd.dut1, site.longitude_rad, site.latitude_rad,
+                                   site.height, 0.0, 0.0, site.temperature_kelvin,
+                                   site.pressure, site.humidity, 0.5, site.lapseRate)]
+
+        for includeRefraction in (True, False):
+            cachedList.append(_calculateObservatoryParameters(self.obs_metadata, 0.5,
+                                                              includeRefraction))
+
+        for params in cachedList:
+            control = params.copy()
+            with self.assertRaises(ValueError):
+                params[0] = 1.0
+            numpy.testing.assert_array_equal(params, control)
+
+        # the read-only parameters must still be accepted by palpy
+        ra_in = numpy.array([0.1, 0.2])
+        dec_in = numpy.array([-0.3, 0.4])
+        ra_app, dec_app = _appGeoFromICRS(ra_in, dec_in, mjd=mjd)
+        ra_icrs, dec_icrs = _icrsFromAppGeo(ra_app, dec_app, mjd=mjd)
+        self.assertLess(numpy.abs(ra_icrs-ra_in).max(), 1.0e-6)
+        self.assertLess(numpy.abs(dec_icrs-dec_in).max(), 1.0e-6)
+
 
 
 def suite():
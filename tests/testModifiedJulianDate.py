@@ -112,6 +112,43 @@ class MjdTest(unittest.TestCase):
             self.assertLess(np.abs(mjd.dut1), 0.9)
 
 
+    def test_fromArray(self):
+        """
+        Test that a ModifiedJulianDate built from an array of dates agrees
+        with building one ModifiedJulianDate per date
+        """
+
+        np.random.seed(119)
+        utc_list = np.random.random_sample(20)*10000.0 + 43000.0
+        mjdArray = ModifiedJulianDate.fromArray(UTC=utc_list)
+
+        self.assertIsInstance(mjdArray.TAI, np.ndarray)
+        self.assertEqual(len(mjdArray.TAI), len(utc_list))
+
+        for ix, utc in enumerate(utc_list):
+            mjd = ModifiedJulianDate(UTC=utc)
+            self.assertAlmostEqual(mjdArray.UTC[ix], mjd.UTC, 15)
+            self.assertAlmostEqual(mjdArray.TAI[ix], mjd.TAI, 15)
+            self.assertAlmostEqual(mjdArray.TT[ix], mjd.TT, 15)
+            self.assertAlmostEqual(mjdArray.TDB[ix], mjd.TDB, 15)
+            self.assertAlmostEqual(mjdArray.UT1[ix], mjd.UT1, 15)
+            self.assertAlmostEqual(mjdArray.dut1[ix], mjd.dut1, 15)
+
+        # dates outside of the IERS table get UT1 = UTC without
+        # spoiling the dates that are inside of it
+        utc_list = np.array([50000.0, 1000000.0])
+        mjdArray = ModifiedJulianDate.fromArray(UTC=utc_list)
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            dut1 = mjdArray.dut1
+            ut1 = mjdArray.UT1
+
+        self.assertAlmostEqual(dut1[0], ModifiedJulianDate(UTC=50000.0).dut1, 15)
+        self.assertEqual(dut1[1], 0.0)
+        self.assertAlmostEqual(ut1[0], ModifiedJulianDate(UTC=50000.0).UT1, 10)
+        self.assertEqual(ut1[1], utc_list[1])
+
+
     def test_eq(self):
         mjd1 = ModifiedJulianDate(TAI=43000.0)
         mjd2 = ModifiedJulianDate(TAI=43000.0)
@@ -119,6 +156,54 @@ class MjdTest(unittest.TestCase):
         mjd3 = ModifiedJulianDate(TAI=43000.01)
         self.assertNotEqual(mjd1, mjd3)
 
+        # dates supplied on the same time scale are compared
+        # without constructing astropy Time objects
+        self.assertNotIn('_astropyTime', mjd1.__dict__)
+        self.assertNotIn('_astropyTime', mjd2.__dict__)
+
+        # equal dates can be used interchangeably as dict keys
+        self.assertEqual(hash(mjd1), hash(mjd2))
+        self.assertEqual({mjd1: 1}[mjd2], 1)
+        self.assertTrue(mjd1 != mjd3)
+        self.assertFalse(mjd1 != mjd2)
+
+        # dates built from arrays compare elementwise and are unhashable
+        mjdArr1 = ModifiedJulianDate.fromArray(TAI=[43000.0, 43000.01])
+        mjdArr2 = ModifiedJulianDate.fromArray(TAI=[43000.0, 43000.02])
+        np.testing.assert_array_equal(mjdArr1 == mjdArr2, [True, False])
+        np.testing.assert_array_equal(mjdArr1 != mjdArr2, [False, True])
+        self.assertRaises(TypeError, hash, mjdArr1)
+        self.assertRaises(TypeError, hash, ModifiedJulianDate.fromArray(TAI=[43000.0]))
+
+
+    def test_readOnly(self):
+        """
+        Test that the time scales cannot be assigned to
+        """
+        mjd = ModifiedJulianDate(TAI=43000.0)
+        tt = mjd.TT
+        for name in ('TAI', 'UTC', 'UT1', 'dut1', 'TT', 'TDB'):
+            self.assertRaises(AttributeError, setattr, mjd, name, 5.0)
+
+        self.assertEqual(mjd.TAI, 43000.0)
+        self.assertEqual(mjd.TT, tt)
+
+
+    def test_lazyTime(self):
+        """
+        Test that reading back the time scale that was supplied does not
+        construct the astropy Time object
+        """
+        mjd = ModifiedJulianDate(TAI=43000.0)
+        self.assertEqual(mjd.TAI, 43000.0)
+        self.assertNotIn('_astropyTime', mjd.__dict__)
+
+        mjd = ModifiedJulianDate(UTC=43000.0)
+        self.assertEqual(mjd.UTC, 43000.0)
+        self.assertNotIn('_astropyTime', mjd.__dict__)
+        self.assertAlmostEqual(mjd.TAI, 43000.0 + 15.0/86400.0, 9)
+        self.assertIn('_astropyTime', mjd.__dict__)
+
 
 def suite():
     """Returns a suite containing all the test cases in this module."""
@@ -1,6 +1,7 @@
 from __future__ import with_statement
 
 import os
+import pickle
 import numpy
 import unittest
 import lsst.utils.tests as utilsTests
@@ -287,6 +288,11 @@ class ObservationMetaDataTest(unittest.TestCase):
         self.assertEqual(obs.mjd, mjd2)
         self.assertNotEqual(obs.mjd, mjd)
 
+        # test assigning an integer MJD (interpreted as TAI)
+        obs.mjd = 45000
+        self.assertEqual(obs.mjd.TAI, 45000.0)
+        self.assertRaises(RuntimeError, setattr, obs, 'mjd', '45000')
+
 
     def testBoundBuilding(self):
         """
@@ -305,6 +311,26 @@ class ObservationMetaDataTest(unittest.TestCase):
         boundControl = BoxBounds(0.0, 0.0, numpy.radians([0.1, 0.3]))
         self.assertEqual(boxObs.bounds, boundControl)
 
+        # test that the bounds are not built until they are requested
+        lazyObs = ObservationMetaData(boundType='nonsense', pointingRA=0.0, pointingDec=0.0,
+                                      boundLength=1.0)
+        with self.assertRaises(RuntimeError):
+            lazyObs.bounds
+        lazyObs.boundType = 'circle'
+        self.assertEqual(lazyObs.bounds, CircleBounds(0.0, 0.0, numpy.radians(1.0)))
+
+        # test that the bounds are rebuilt after the parameters defining
+        # them change, and are reused otherwise
+        bounds = circObs.bounds
+        self.assertIs(circObs.bounds, bounds)
+        circObs.pointingRA = 10.0
+        circObs.boundLength = 2.0
+        boundControl = CircleBounds(numpy.radians(10.0), 0.0, numpy.radians(2.0))
+        self.assertEqual(circObs.bounds, boundControl)
+        circObs.boundType = 'box'
+        boundControl = BoxBounds(numpy.radians(10.0), 0.0, numpy.radians(2.0))
+        self.assertEqual(circObs.bounds, boundControl)
+
     def testBounds(self):
         """
         Test if ObservationMetaData correctly assigns the pointing[RA,Dec]
@@ -339,6 +365,53 @@ class ObservationMetaDataTest(unittest.TestCase):
         obs.summary
 
 
+    def testPickle(self):
+        """
+        Test that an ObservationMetaData survives being pickled
+        """
+        obs = ObservationMetaData(boundType='circle', boundLength=1.5,
+                                  pointingRA=10.0, pointingDec=-20.0, rotSkyPos=5.0,
+                                  mjd=53580.0, bandpassName=['u', 'g'], m5=[23.0, 24.0])
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL+1):
+            unpickled = pickle.loads(pickle.dumps(obs, protocol))
+            self.assertEqual(unpickled.pointingRA, obs.pointingRA)
+            self.assertEqual(unpickled.pointingDec, obs.pointingDec)
+            self.assertEqual(unpickled.rotSkyPos, obs.rotSkyPos)
+            self.assertEqual(unpickled.boundLength, obs.boundLength)
+            self.assertEqual(unpickled.mjd.TAI, obs.mjd.TAI)
+            self.assertEqual(unpickled.m5, obs.m5)
+            self.assertEqual(unpickled.bounds, obs.bounds)
+
+
+    def testSummaryCache(self):
+        """
+        Test that summary is rebuilt after a parameter it summarizes is changed
+        """
+        obs = ObservationMetaData(pointingRA=10.0, pointingDec=-20.0, mjd=53580.0)
+        summary = obs.summary
+        self.assertEqual(obs.summary, summary)
+        self.assertAlmostEqual(summary['pointingRA'], 10.0, 10)
+
+        # modifying the returned dict must not change later summaries
+        summary['pointingRA'] = 99.0
+        summary['extra'] = 'value'
+        self.assertAlmostEqual(obs.summary['pointingRA'], 10.0, 10)
+        self.assertNotIn('extra', obs.summary)
+
+        obs.pointingRA = 30.0
+        self.assertAlmostEqual(obs.summary['pointingRA'], 30.0, 10)
+
+        obs.mjd = 54000.0
+        self.assertEqual(obs.summary['mjd'], 54000.0)
+
+        obs.skyBrightness = 21.0
+        self.assertEqual(obs.summary['skyBrightness'], 21.0)
+
+        obs.setBandpassM5andSeeing(bandpassName='g')
+        self.assertEqual(obs.summary['bandpass'], 'g')
+
+
 def suite():
     """Returns a suite containing all the test cases in this module."""
     utilsTests.init()
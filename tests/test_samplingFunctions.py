@@ -25,12 +25,12 @@ class SamplingTests(unittest.TestCase):
     def setUpClass(cls):
         """
         """
-	cls.obsMetaDataforCat = ObservationMetaData(boundType='circle',
+        cls.obsMetaDataforCat = ObservationMetaData(boundType='circle',
                                           boundLength=np.degrees(0.25),
                                           pointingRA=np.degrees(0.13),
                                           pointingDec=np.degrees(-1.2),
                                           bandpassName=['r'],
-					  mjd=49350.)
+                                          mjd=49350.)
         ObsMetaData = cls.obsMetaDataforCat
         cls.samples = spatiallySample_obsmetadata(ObsMetaData, size=1000)
 
@@ -69,35 +69,42 @@ class SamplingTests(unittest.TestCase):
         minTheta =  -1.2 - delta
         maxTheta = -1.2  + delta
 
-        assert all(np.radians(self.samples[0]) <= maxPhi)
-        assert all(np.radians(self.samples[0]) >= minPhi)
-        assert all(np.radians(self.samples[1]) >= minTheta)
-        assert all(np.radians(self.samples[1]) <= maxTheta)
+        phi = np.radians(self.samples[0])
+        theta = np.radians(self.samples[1])
+
+        assert np.all(phi <= maxPhi)
+        assert np.all(phi >= minPhi)
+        assert np.all(theta >= minTheta)
+        assert np.all(theta <= maxTheta)
 
     def test_samplePatchOnSphere(self):
         
 
-        A = lambda theta_min, theta_max: np.sin(theta_max) - np.sin(theta_min)
-
-
         theta_c = np.radians(self.theta_c)
         delta = np.radians(self.delta)
 
         theta_min = theta_c - delta
         theta_max = theta_c + delta
         tvals = np.arange(theta_min, theta_max, 0.001) 
-        tvalsShifted = np.zeros(len(tvals))
-        tvalsShifted[:-1] = tvals[1:]
 
-        area = A(tvals, tvalsShifted)
+        # area of the band between consecutive values of theta
+        sin_t = np.sin(tvals)
+        area = np.empty_like(tvals)
+        area[:-1] = sin_t[1:] - sin_t[:-1]
+        area[-1] = 0.0
         
         binsize = np.unique(np.diff(tvals))
         assert binsize.size == 1
         normval = np.sum(area) * binsize[0]
 
 
+        # tvals is uniformly spaced, so the bin of each sample can be
+        # computed directly rather than searched for by np.histogram
+        nBins = len(tvals) - 2
         theta_samps = np.radians(self.dense_samples[1])
-        binnedvals = np.histogram(theta_samps, bins=tvals[:-1], normed=True)[0]
+        idx = np.floor((theta_samps - theta_min) / binsize[0]).astype(np.int64)
+        counts = np.bincount(idx[(idx >= 0) & (idx < nBins)], minlength=nBins)
+        binnedvals = counts / (counts.sum() * binsize[0])
         resids = area[:-2] / normval - binnedvals
 
         fiveSigma = np.sqrt(binnedvals) * 5.0